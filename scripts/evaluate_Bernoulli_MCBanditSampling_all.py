@@ -8,6 +8,9 @@ import sys, os
 import argparse
 from itertools import *
 import pdb
+import matplotlib
+# Non-interactive backend: plots are only saved to file
+matplotlib.use('Agg')
 from matplotlib import colors
 
 # Add path and import Bayesian Bandits
@@ -87,9 +90,8 @@ def main(A, t_max, M, N_max, R, exec_type, theta):
     bandits_labels.append('MC Markov log10(1/Pfa), M_a={}, M_theta={}'.format(invPfaSampling['M'], mc_reward_prior['M']))
      
     ### BANDIT EXECUTION
-    # Execute each bandit
-    for (n,bandit) in enumerate(bandits):
-        bandit.execute_realizations(R, t_max, context, exec_type)
+    # Execute all bandits
+    execute_bandits(bandits, R, t_max, context, exec_type)
     
     # Save bandits info
     with open(dir_string+'/bandits.pickle', 'wb') as f:
@@ -109,17 +111,11 @@ def main(A, t_max, M, N_max, R, exec_type, theta):
     t_plot=t_max
     
     ## GENERAL
-    # Plot regret
+    # Plot rewards and regrets summary (rewards, cumulative rewards, regret and cumregret)
     plot_std=False
-    bandits_plot_regret(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
+    bandits_plot_summary(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
     plot_std=True
-    bandits_plot_regret(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
-
-    # Plot cumregret
-    plot_std=False
-    bandits_plot_cumregret(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
-    plot_std=True
-    bandits_plot_cumregret(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
+    bandits_plot_summary(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
     
     # Plot rewards expected
     plot_std=True
@@ -141,6 +137,9 @@ def main(A, t_max, M, N_max, R, exec_type, theta):
     # Plot action predictive density
     plot_std=True
     bandits_plot_arm_density(bandits, bandits_colors, bandits_labels, t_plot, plot_std, plot_save=dir_plots)
+
+    # Release all figures
+    plt.close('all')
     ###############
             
 # Making sure the main program is not executed when the module is imported
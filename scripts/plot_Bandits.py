@@ -4,6 +4,9 @@
 import numpy as np
 import scipy.stats as stats
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+# Simplify long curves as much as possible when rendering
+plt.rcParams['path.simplify_threshold']=1.0
 
 # Bandits
 from Bandit import * 
@@ -22,6 +25,143 @@ from VariationalBanditQuantiles import *
 # Bandit plotting functions
 ################################
 
+# Plotting helper: curve downsampling
+def lttb_downsample(x, y, n_out):
+    """ Select which points of a curve to plot, via Largest-Triangle-Three-Buckets downsampling
+        The first and last points are kept, and one point is picked from each of n_out-2 buckets in between:
+        the one forming the largest triangle with the previously picked point and the average of the next bucket
+        
+        Args:
+            x: x values of the curve
+            y: y values of the curve
+            n_out: number of points to keep
+        Rets:
+            idx: indexes of the points to keep
+    """
+    n=x.size
+    if n_out>=n or n_out<3:
+        # Nothing to downsample
+        return np.arange(n)
+
+    # Bucket limits, for the points in between the first and the last
+    edges=np.linspace(1, n-1, n_out-1).astype(int)
+    # Averages of all buckets at once, shifted so that bucket b gets the average of the next bucket (last point for the last bucket)
+    bucket_size=np.diff(edges)
+    next_x=np.append(np.add.reduceat(x[:edges[-1]], edges[:-1])[1:]/bucket_size[1:], x[-1])
+    next_y=np.append(np.add.reduceat(y[:edges[-1]], edges[:-1])[1:]/bucket_size[1:], y[-1])
+    idx=np.zeros(n_out, dtype=int)
+    idx[-1]=n-1
+    for b in np.arange(n_out-2):
+        # Triangle areas for the points in this bucket (up to a factor of 2)
+        prev_x=x[idx[b]]
+        prev_y=y[idx[b]]
+        area=np.abs((prev_x-next_x[b])*(y[edges[b]:edges[b+1]]-prev_y)-(prev_x-x[edges[b]:edges[b+1]])*(next_y[b]-prev_y))
+        idx[b+1]=edges[b]+area.argmax()
+
+    return idx
+
+# Plotting helper: standard deviation band polygon
+def band_polygon(x, mean, std):
+    """ Vertices of the mean +/- std band of a curve: lower edge forward, upper edge backward
+        Both edges are computed straight into the vertex array, without intermediate arrays
+        
+        Args:
+            x: time instants of the curve
+            mean: mean curve
+            std: standard deviation curve
+        Rets:
+            vertices: 2*x.size by 2 array with the band's vertices
+    """
+    n=x.size
+    vertices=np.empty((2*n,2))
+    vertices[:n,0]=x
+    vertices[n:,0]=x[::-1]
+    np.subtract(mean, std, out=vertices[:n,1])
+    np.add(mean[::-1], std[::-1], out=vertices[n:,1])
+    return vertices
+
+# Plotting helper: mean curves and standard deviation bands
+def plot_curves(ax, x, means, stds, colors, labels, n_points=2000):
+    """ Plot a set of mean curves (and their standard deviation bands) in the given axes
+        All curves are drawn as a single line collection, and all bands as a single polygon collection
+        Curves with more than 2*n_points time instants are downsampled to n_points before plotting
+        
+        Args:
+            ax: axes to plot in
+            x: time instants to plot
+            means: list of mean curves to plot
+            stds: list of standard deviation curves to plot (empty if not to plot them)
+            colors: color list for each curve
+            labels: label list for each curve
+            n_points: number of points to plot per downsampled curve
+        Rets:
+            None
+    """
+    colors=colors[:len(means)]
+    # Points to plot per curve (bands use the points of their mean curve)
+    if x.size>2*n_points:
+        idx=[lttb_downsample(x, mean, n_points) for mean in means]
+    else:
+        # All points, as views (no copies)
+        idx=[slice(None)]*len(means)
+    if len(stds)>0:
+        ax.add_collection(PolyCollection([band_polygon(x[i], mean[i], std[i]) for (mean,std,i) in zip(means,stds,idx)], facecolors=colors, edgecolors='none', alpha=0.5, rasterized=True))
+    ax.add_collection(LineCollection([np.column_stack((x[i],mean[i])) for (mean,i) in zip(means,idx)], colors=colors))
+    ax.autoscale_view()
+    # Legend entries
+    for (color,label) in zip(colors,labels):
+        ax.plot([], [], color=color, label=label)
+
+# Plotting helper: figure output
+def plot_show_or_save(fig, plot_save, file_name):
+    """ Show a figure, or save it to file, and release it
+        
+        Args:
+            fig: figure to show or save
+            plot_save: whether to save (in given dir) or not the figure
+            file_name: name of the file to save the figure to
+        Rets:
+            None
+    """
+    if plot_save is None: 
+        plt.show()
+    else:
+        fig.savefig(plot_save+'/'+file_name, format='pdf', bbox_inches='tight')
+    # Release the figure, so that figures do not accumulate in pyplot
+    plt.close(fig)
+
+# Plotting helper: arm by time heatmaps
+def plot_heatmap(fig, ax, values):
+    """ Plot an arm by time matrix of probabilities as a heatmap in the given axes
+        
+        Args:
+            fig: figure the axes belong to
+            ax: axes to plot in
+            values: A by t_plot matrix to plot
+        Rets:
+            None
+    """
+    image=ax.imshow(values, aspect='auto', origin='lower', interpolation='nearest', vmin=0, vmax=1, rasterized=True)
+    ax.set_yticks(np.arange(values.shape[0]))
+    fig.colorbar(image, ax=ax)
+
+# Plotting helper: cumulative rewards standard deviations
+def cumrewards_std_curves(bandits, t_plot, plot_std):
+    """ Standard deviation curves of the cumulative rewards of a set of bandits
+        Unlike the means, these need all realizations (i.e., batch execution)
+        
+        Args:
+            bandits: bandit list
+            t_plot: max time to plot
+            plot_std: whether to plot standard deviations or not
+        Rets:
+            cumrewards_std: list of standard deviation curves (empty if not to plot them, or without all realizations)
+    """
+    if plot_std and all('all' in bandit.rewards_R for bandit in bandits):
+        return [bandit.rewards_R['all'][:,0,0:t_plot].cumsum(axis=1, dtype=np.float64).std(axis=0) for bandit in bandits]
+    else:
+        return []
+
 ### GENERAL bandits
 # Bandit plotting function: rewards 
 def bandits_plot_rewards(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -37,23 +177,20 @@ def bandits_plot_rewards(bandits, colors, labels, t_plot, plot_std=True, plot_sa
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # rewards over time
-    plt.figure()
-    plt.plot(np.arange(t_plot), bandits[0].true_expected_rewards.max(axis=0)[0:t_plot], 'k', label='Expected')
-    for (n,bandit) in enumerate(bandits):
-        plt.plot(np.arange(t_plot), bandit.rewards_R['mean'][0,0:t_plot], colors[n], label=labels[n])
-        if plot_std:
-            plt.fill_between(np.arange(t_plot), bandit.rewards_R['mean'][0,0:t_plot]-np.sqrt(bandit.rewards_R['var'][0,0:t_plot]), bandit.rewards_R['mean'][0,0:t_plot]+np.sqrt(bandit.rewards_R['var'][0,0:t_plot]),alpha=0.5, facecolor=colors[n])
+    fig, ax = plt.subplots()
+    ax.plot(x, bandits[0].true_expected_rewards[:,0:t_plot].max(axis=0), 'k', label='Expected')
+    rewards_mean=[bandit.rewards_R['mean'][0,0:t_plot] for bandit in bandits]
+    rewards_std=[np.sqrt(bandit.rewards_R['var'][0,0:t_plot]) for bandit in bandits] if plot_std else []
+    plot_curves(ax, x, rewards_mean, rewards_std, colors, labels)
     plt.xlabel('t')
     plt.ylabel(r'$y_t$')
     plt.title('rewards over time')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/rewards_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'rewards_std'+str(plot_std)+'.pdf')
 
 # Bandit plotting function: cumulative rewards 
 def bandits_plot_cumrewards(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -69,21 +206,22 @@ def bandits_plot_cumrewards(bandits, colors, labels, t_plot, plot_std=True, plot
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Cumulative rewards over time
-    plt.figure()
-    plt.plot(np.arange(t_plot), bandits[0].true_expected_rewards.max(axis=0)[0:t_plot], 'k', label='Expected')
-    for (n,bandit) in enumerate(bandits):
-        plt.plot(np.arange(t_plot),bandit.rewards_R['mean'][0,0:t_plot].cumsum(axis=1), colors[n], label=labels[n])
+    fig, ax = plt.subplots()
+    ax.plot(x, bandits[0].true_expected_rewards[:,0:t_plot].max(axis=0).cumsum(), 'k', label='Expected')
+    # Averaging over realizations and accumulating over time commute: accumulate the (already averaged) mean rewards
+    cumrewards_mean=[bandit.rewards_R['mean'][0,0:t_plot].cumsum() for bandit in bandits]
+    # Standard deviations do not commute: they need all realizations (i.e., batch execution)
+    cumrewards_std=cumrewards_std_curves(bandits, t_plot, plot_std)
+    plot_curves(ax, x, cumrewards_mean, cumrewards_std, colors, labels)
     plt.xlabel('t')
     plt.ylabel(r'$\sum_{t=0}^Ty_t$')
     plt.title('Cumulative rewards over time')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/rewards_cumulative_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'rewards_cumulative_std'+str(plot_std)+'.pdf')
 
 # Bandit plotting function: expected rewards
 def bandits_plot_rewards_expected(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -99,24 +237,21 @@ def bandits_plot_rewards_expected(bandits, colors, labels, t_plot, plot_std=True
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Expected rewards per arm, over time
     for a in np.arange(0,bandits[0].A):
-        plt.figure()
-        plt.plot(np.arange(t_plot), bandits[0].true_expected_rewards[a,0:t_plot], 'k', label='Expected')
-        for (n,bandit) in enumerate(bandits):
-            plt.plot(np.arange(t_plot), bandit.rewards_expected_R['mean'][a,0:t_plot], colors[n], label=labels[n])
-            if plot_std:
-                plt.fill_between(np.arange(t_plot), bandit.rewards_expected_R['mean'][a,0:t_plot]-np.sqrt(bandit.rewards_expected_R['var'][a,0:t_plot]), bandit.rewards_expected_R['mean'][a,0:t_plot]+np.sqrt(bandit.rewards_expected_R['var'][a,0:t_plot]),alpha=0.5, facecolor=colors[n])
+        fig, ax = plt.subplots()
+        ax.plot(x, bandits[0].true_expected_rewards[a,0:t_plot], 'k', label='Expected')
+        rewards_expected_mean=[bandit.rewards_expected_R['mean'][a,0:t_plot] for bandit in bandits]
+        rewards_expected_std=[np.sqrt(bandit.rewards_expected_R['var'][a,0:t_plot]) for bandit in bandits] if plot_std else []
+        plot_curves(ax, x, rewards_expected_mean, rewards_expected_std, colors, labels)
         plt.ylabel(r'$E\{\mu_{a,t}\}$')
         plt.xlabel('t')
         plt.title('Expected rewards over time for arm {}'.format(a))
         plt.xlim([0, t_plot-1])
         legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-        if plot_save is None: 
-            plt.show()
-        else:
-            plt.savefig(plot_save+'/rewards_expected_{}_std{}.pdf'.format(a,str(plot_std)), format='pdf', bbox_inches='tight')
-            plt.close()
+        plot_show_or_save(fig, plot_save, 'rewards_expected_{}_std{}.pdf'.format(a,str(plot_std)))
 
 # Bandit plotting function: regrets 
 def bandits_plot_regret(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -132,22 +267,19 @@ def bandits_plot_regret(bandits, colors, labels, t_plot, plot_std=True, plot_sav
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Regret over time
-    plt.figure()
-    for (n,bandit) in enumerate(bandits):
-        plt.plot(np.arange(t_plot), bandit.regrets_R['mean'][0,0:t_plot], colors[n], label=labels[n])
-        if plot_std:
-            plt.fill_between(np.arange(t_plot), bandit.regrets_R['mean'][0,0:t_plot]-np.sqrt(bandit.regrets_R['var'][0,0:t_plot]), bandit.regrets_R['mean'][0,0:t_plot]+np.sqrt(bandit.regrets_R['var'][0,0:t_plot]),alpha=0.5, facecolor=colors[n])
+    fig, ax = plt.subplots()
+    regrets_mean=[bandit.regrets_R['mean'][0,0:t_plot] for bandit in bandits]
+    regrets_std=[np.sqrt(bandit.regrets_R['var'][0,0:t_plot]) for bandit in bandits] if plot_std else []
+    plot_curves(ax, x, regrets_mean, regrets_std, colors, labels)
     plt.xlabel('t')
     plt.ylabel(r'$r_t=y_t^*-y_t$')
     plt.title('Regret over time')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/regret_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'regret_std'+str(plot_std)+'.pdf')
 
 # Bandit plotting function: regrets 
 def bandits_plot_cumregret(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -163,25 +295,78 @@ def bandits_plot_cumregret(bandits, colors, labels, t_plot, plot_std=True, plot_
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Cumulative regret over time
-    plt.figure()
-    for (n,bandit) in enumerate(bandits):
-        plt.plot(np.arange(t_plot), bandit.cumregrets_R['mean'][0,0:t_plot], colors[n], label=labels[n])
-        if plot_std:
-            plt.fill_between(np.arange(t_plot), bandit.cumregrets_R['mean'][0,0:t_plot]-np.sqrt(bandit.cumregrets_R['var'][0,0:t_plot]), bandit.cumregrets_R['mean'][0,0:t_plot]+np.sqrt(bandit.cumregrets_R['var'][0,0:t_plot]),alpha=0.5, facecolor=colors[n])
+    fig, ax = plt.subplots()
+    cumregrets_mean=[bandit.cumregrets_R['mean'][0,0:t_plot] for bandit in bandits]
+    cumregrets_std=[np.sqrt(bandit.cumregrets_R['var'][0,0:t_plot]) for bandit in bandits] if plot_std else []
+    plot_curves(ax, x, cumregrets_mean, cumregrets_std, colors, labels)
     plt.xlabel('t')
     plt.ylabel(r'$R_t=\sum_{t=0}^T y_t^*-y_t$')
     plt.title('Cumulative regret over time')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/cumregret_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'cumregret_std'+str(plot_std)+'.pdf')
+
+# Bandit plotting function: rewards and regrets summary
+def bandits_plot_summary(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
+    """ Plot rewards, cumulative rewards, regrets and cumulative regrets for a set of bandits, in a single 2x2 figure
+        
+        Args:
+            bandits: bandit list
+            colors: color list for each bandit
+            labels: label list for each bandit
+            t_plot: max time to plot
+            plot_std: whether to plot standard deviations or not
+            plot_save: whether to save (in given dir) or not plots
+        Rets:
+            None
+    """
+    # Time instants to plot
+    x=np.arange(t_plot)
+    expected_rewards=bandits[0].true_expected_rewards[:,0:t_plot].max(axis=0)
+    fig, axes = plt.subplots(2, 2, sharex=True, figsize=(12,8))
+    
+    # rewards over time
+    rewards_mean=[bandit.rewards_R['mean'][0,0:t_plot] for bandit in bandits]
+    rewards_std=[np.sqrt(bandit.rewards_R['var'][0,0:t_plot]) for bandit in bandits] if plot_std else []
+    axes[0,0].plot(x, expected_rewards, 'k', label='Expected')
+    plot_curves(axes[0,0], x, rewards_mean, rewards_std, colors, labels)
+    axes[0,0].set_ylabel(r'$y_t$')
+    axes[0,0].set_title('rewards over time')
+    
+    # Cumulative rewards over time (see bandits_plot_cumrewards)
+    cumrewards_mean=[rewards.cumsum() for rewards in rewards_mean]
+    cumrewards_std=cumrewards_std_curves(bandits, t_plot, plot_std)
+    axes[0,1].plot(x, expected_rewards.cumsum(), 'k', label='Expected')
+    plot_curves(axes[0,1], x, cumrewards_mean, cumrewards_std, colors, labels)
+    axes[0,1].set_ylabel(r'$\sum_{t=0}^Ty_t$')
+    axes[0,1].set_title('Cumulative rewards over time')
+    
+    # Regret over time
+    regrets_mean=[bandit.regrets_R['mean'][0,0:t_plot] for bandit in bandits]
+    regrets_std=[np.sqrt(bandit.regrets_R['var'][0,0:t_plot]) for bandit in bandits] if plot_std else []
+    plot_curves(axes[1,0], x, regrets_mean, regrets_std, colors, labels)
+    axes[1,0].set_ylabel(r'$r_t=y_t^*-y_t$')
+    axes[1,0].set_title('Regret over time')
+    
+    # Cumulative regret over time
+    cumregrets_mean=[bandit.cumregrets_R['mean'][0,0:t_plot] for bandit in bandits]
+    cumregrets_std=[np.sqrt(bandit.cumregrets_R['var'][0,0:t_plot]) for bandit in bandits] if plot_std else []
+    plot_curves(axes[1,1], x, cumregrets_mean, cumregrets_std, colors, labels)
+    axes[1,1].set_ylabel(r'$R_t=\sum_{t=0}^T y_t^*-y_t$')
+    axes[1,1].set_title('Cumulative regret over time')
+    
+    # Shared time axis, and a single legend for all
+    for ax in axes[1,:]:
+        ax.set_xlabel('t')
+    axes[0,0].set_xlim([0, t_plot-1])
+    legend = axes[0,1].legend(*axes[0,0].get_legend_handles_labels(), bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
+    plot_show_or_save(fig, plot_save, 'summary_std'+str(plot_std)+'.pdf')
 
 # Bandit plotting function: actions
-def bandits_plot_actions(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
+def bandits_plot_actions(bandits, colors, labels, t_plot, plot_std=True, plot_save=None, heatmap=False):
     """ Plot the played (averaged) actions for a set of bandits
         
         Args:
@@ -191,26 +376,34 @@ def bandits_plot_actions(bandits, colors, labels, t_plot, plot_std=True, plot_sa
             t_plot: max time to plot
             plot_std: whether to plot standard deviations or not
             plot_save: whether to save (in given dir) or not plots
+            heatmap: whether to plot a single arm by time heatmap per bandit, instead of a figure per arm
         Rets:
             None
     """
-    # Action (average probabilities) over time
-    for a in np.arange(0,bandits[0].A):
-        plt.figure()
+    # Time instants to plot
+    x=np.arange(t_plot)
+    if heatmap:
+        # Action (average probabilities) over time, as an arm by time heatmap per bandit
         for (n,bandit) in enumerate(bandits):
-            plt.plot(np.arange(t_plot), bandit.actions_R['mean'][a,0:t_plot], colors[n], label=labels[n]+' actions')
-            if plot_std:
-                plt.fill_between(np.arange(t_plot), bandit.actions_R['mean'][a,0:t_plot]-np.sqrt(bandit.actions_R['var'][a,0:t_plot]), bandit.actions_R['mean'][a,0:t_plot]+np.sqrt(bandit.actions_R['var'][a,0:t_plot]),alpha=0.5, facecolor=colors[n])
-        plt.ylabel(r'$f(a_{t+1}=a|a_{1:t}, y_{1:t})$')
-        plt.xlabel('t')
-        plt.title('Averaged Action probabilities for arm {}'.format(a))
-        plt.xlim([0, t_plot-1])
-        legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-        if plot_save is None: 
-            plt.show()
-        else:
-            plt.savefig(plot_save+'/actions_{}_std{}.pdf'.format(a,str(plot_std)), format='pdf', bbox_inches='tight')
-            plt.close()
+            fig, ax = plt.subplots()
+            plot_heatmap(fig, ax, bandit.actions_R['mean'][:,0:t_plot])
+            plt.ylabel('a')
+            plt.xlabel('t')
+            plt.title('Averaged Action probabilities for {}'.format(labels[n]))
+            plot_show_or_save(fig, plot_save, 'actions_heatmap_{}.pdf'.format(n))
+    else:
+        # Action (average probabilities) over time
+        for a in np.arange(0,bandits[0].A):
+            fig, ax = plt.subplots()
+            actions_mean=[bandit.actions_R['mean'][a,0:t_plot] for bandit in bandits]
+            actions_std=[np.sqrt(bandit.actions_R['var'][a,0:t_plot]) for bandit in bandits] if plot_std else []
+            plot_curves(ax, x, actions_mean, actions_std, colors, [label+' actions' for label in labels])
+            plt.ylabel(r'$f(a_{t+1}=a|a_{1:t}, y_{1:t})$')
+            plt.xlabel('t')
+            plt.title('Averaged Action probabilities for arm {}'.format(a))
+            plt.xlim([0, t_plot-1])
+            legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
+            plot_show_or_save(fig, plot_save, 'actions_{}_std{}.pdf'.format(a,str(plot_std)))
 
 # Bandit plotting function: correct actions
 def bandits_plot_actions_correct(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -226,26 +419,25 @@ def bandits_plot_actions_correct(bandits, colors, labels, t_plot, plot_std=True,
         Rets:
             None
     """   
+    # Time instants to plot
+    x=np.arange(t_plot)
 	# Correct arm selection probability
-    plt.figure()
-    for (n,bandit) in enumerate(bandits):
-        plt.plot(np.arange(t_plot), bandit.actions_R['mean'][bandit.true_expected_rewards.argmax(axis=0)[0:t_plot],np.arange(t_plot)], colors[n], label=labels[n])
-        if plot_std:
-            plt.fill_between(np.arange(t_plot), bandit.actions_R['mean'][bandit.true_expected_rewards.argmax(axis=0),np.arange(t_plot)]-np.sqrt(bandit.actions_R['var'][bandit.true_expected_rewards.argmax(axis=0),np.arange(t_plot)]), bandit.actions_R['mean'][bandit.true_expected_rewards.argmax(axis=0),np.arange(t_plot)]+np.sqrt(bandit.actions_R['var'][bandit.true_expected_rewards.argmax(axis=0),np.arange(t_plot)]),alpha=0.5, facecolor=colors[n])
+    fig, ax = plt.subplots()
+    # Best arm at each time instant, per bandit
+    best_arms=[bandit.true_expected_rewards[:,0:t_plot].argmax(axis=0) for bandit in bandits]
+    correct_actions_mean=[bandit.actions_R['mean'][best_arm,x] for (bandit,best_arm) in zip(bandits,best_arms)]
+    correct_actions_std=[np.sqrt(bandit.actions_R['var'][best_arm,x]) for (bandit,best_arm) in zip(bandits,best_arms)] if plot_std else []
+    plot_curves(ax, x, correct_actions_mean, correct_actions_std, colors, labels)
     plt.ylabel(r'$f(a_{t+1}=a^*|a_{1:t}, y_{1:t})$')
     plt.xlabel('t')
     plt.title('Averaged Correct Action probabilities')
     plt.axis([0, t_plot-1, 0, 1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/correct_actions_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'correct_actions_std'+str(plot_std)+'.pdf')
 
 ## SAMPLING bandits
 # Bandit Sampling plotting function: arm predictive density
-def bandits_plot_arm_density(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
+def bandits_plot_arm_density(bandits, colors, labels, t_plot, plot_std=True, plot_save=None, heatmap=False):
     """ Plot the computed predictive arm density for a set of bandits
         
         Args:
@@ -255,27 +447,38 @@ def bandits_plot_arm_density(bandits, colors, labels, t_plot, plot_std=True, plo
             t_plot: max time to plot
             plot_std: whether to plot standard deviations or not
             plot_save: whether to save (in given dir) or not plots
+            heatmap: whether to plot a single arm by time heatmap per bandit, instead of a figure per arm
         Rets:
             None
     """
-    # arm predictive density probabilities over time
-    for a in np.arange(0,bandits[0].A):
-        plt.figure()
-        for (n,bandit) in enumerate(bandits):
-            if isinstance(bandit,BanditSampling):
-                plt.plot(np.arange(t_plot), bandit.arm_predictive_density_R['mean'][a,0:t_plot], colors[n], label=labels[n])
-                if plot_std:
-                    plt.fill_between(np.arange(t_plot), bandit.arm_predictive_density_R['mean'][a,0:t_plot]-np.sqrt(bandit.arm_predictive_density_R['var'][a,0:t_plot]), bandit.arm_predictive_density_R['mean'][a,0:t_plot]+np.sqrt(bandit.arm_predictive_density_R['var'][a,0:t_plot]),alpha=0.5, facecolor=colors[n])
-        plt.ylabel(r'$f(a_{t+1}=a|a_{1:t}, y_{1:t})$')
-        plt.xlabel('t')
-        plt.title('Averaged Action Predictive density probabilities for arm {}'.format(a))
-        plt.xlim([0, t_plot-1])
-        legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-        if plot_save is None: 
-            plt.show()
-        else:
-            plt.savefig(plot_save+'/action_density_{}_std{}.pdf'.format(a,str(plot_std)), format='pdf', bbox_inches='tight')
-            plt.close()
+    # Time instants to plot
+    x=np.arange(t_plot)
+    # Sampling bandits (and their colors and labels), selected once for all arms
+    sampling_bandits=[n for (n,bandit) in enumerate(bandits) if isinstance(bandit,BanditSampling)]
+    sampling_colors=[colors[n] for n in sampling_bandits]
+    sampling_labels=[labels[n] for n in sampling_bandits]
+    if heatmap:
+        # arm predictive density probabilities over time, as an arm by time heatmap per sampling bandit
+        for n in sampling_bandits:
+            fig, ax = plt.subplots()
+            plot_heatmap(fig, ax, bandits[n].arm_predictive_density_R['mean'][:,0:t_plot])
+            plt.ylabel('a')
+            plt.xlabel('t')
+            plt.title('Averaged Action Predictive density probabilities for {}'.format(labels[n]))
+            plot_show_or_save(fig, plot_save, 'action_density_heatmap_{}.pdf'.format(n))
+    else:
+        # arm predictive density probabilities over time
+        for a in np.arange(0,bandits[0].A):
+            fig, ax = plt.subplots()
+            arm_density_mean=[bandits[n].arm_predictive_density_R['mean'][a,0:t_plot] for n in sampling_bandits]
+            arm_density_std=[np.sqrt(bandits[n].arm_predictive_density_R['var'][a,0:t_plot]) for n in sampling_bandits] if plot_std else []
+            plot_curves(ax, x, arm_density_mean, arm_density_std, sampling_colors, sampling_labels)
+            plt.ylabel(r'$f(a_{t+1}=a|a_{1:t}, y_{1:t})$')
+            plt.xlabel('t')
+            plt.title('Averaged Action Predictive density probabilities for arm {}'.format(a))
+            plt.xlim([0, t_plot-1])
+            legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
+            plot_show_or_save(fig, plot_save, 'action_density_{}_std{}.pdf'.format(a,str(plot_std)))
 
 # Bandit Sampling plotting function: correct action predictive density percentages
 def bandits_plot_action_density_correct(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -291,21 +494,19 @@ def bandits_plot_action_density_correct(bandits, colors, labels, t_plot, plot_st
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Correct argmax(action_density)
-    plt.figure()
-    for (n,bandit) in enumerate(bandits):
-        if isinstance(bandit,BanditSampling):
-            plt.plot(np.arange(t_plot), (bandit.arms_predictive_density_R['mean'].argmax(axis=0)==(bandit.A-1)).astype(int), colors[n], label=labels[n])
+    fig, ax = plt.subplots()
+    sampling_bandits=[n for (n,bandit) in enumerate(bandits) if isinstance(bandit,BanditSampling)]
+    arm_density_correct=[(bandits[n].arms_predictive_density_R['mean'].argmax(axis=0)==(bandits[n].A-1)).astype(int) for n in sampling_bandits]
+    plot_curves(ax, x, arm_density_correct, [], [colors[n] for n in sampling_bandits], [labels[n] for n in sampling_bandits])
     plt.xlabel('t')
     plt.ylabel('% Correct')
     plt.title('Correct action predictive density percentage')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/action_density_correct_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'action_density_correct_std'+str(plot_std)+'.pdf')
 
 # Bandit Sampling plotting function: arm_N_samples 
 def bandits_plot_arm_n_samples(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -321,22 +522,19 @@ def bandits_plot_arm_n_samples(bandits, colors, labels, t_plot, plot_std=True, p
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Arm N samples over time
-    plt.figure()
-    for (n,bandit) in enumerate(bandits):
-        plt.plot(np.arange(t_plot), bandit.arm_N_samples_R['mean'][0:t_plot], colors[n], label=labels[n])
-        if plot_std:
-            plt.fill_between(np.arange(t_plot), bandit.arm_N_samples_R['mean'][0:t_plot]-np.sqrt(bandit.arm_N_samples_R['var'][0:t_plot]), bandit.arm_N_samples_R['mean'][0:t_plot]+np.sqrt(bandit.arm_N_samples_R['var'][0:t_plot]),alpha=0.5, facecolor=colors[n])
+    fig, ax = plt.subplots()
+    arm_N_samples_mean=[bandit.arm_N_samples_R['mean'][0:t_plot] for bandit in bandits]
+    arm_N_samples_std=[np.sqrt(bandit.arm_N_samples_R['var'][0:t_plot]) for bandit in bandits] if plot_std else []
+    plot_curves(ax, x, arm_N_samples_mean, arm_N_samples_std, colors, labels)
     plt.xlabel('t')
     plt.ylabel(r'$M_t$')
     plt.title('arm_N_samples over time')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/arm_N_samples_R_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()
+    plot_show_or_save(fig, plot_save, 'arm_N_samples_R_std'+str(plot_std)+'.pdf')
 
 ## QUANTILE bandits
 # Bandit Quantiles plotting function: arm quantiles
@@ -353,24 +551,24 @@ def bandits_plot_arm_quantile(bandits, colors, labels, t_plot, plot_std=True, pl
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
+    # Quantile bandits (and their colors and labels), selected once for all arms
+    quantile_bandits=[n for (n,bandit) in enumerate(bandits) if isinstance(bandit,BanditQuantiles)]
+    quantile_colors=[colors[n] for n in quantile_bandits]
+    quantile_labels=[labels[n] for n in quantile_bandits]
     # arm quantiles over time
     for a in np.arange(0,bandits[0].A):
-        plt.figure()
-        for (n,bandit) in enumerate(bandits):
-            if isinstance(bandit,BanditQuantiles):
-                plt.plot(np.arange(t_plot), bandit.arm_quantile_R['mean'][a,0:t_plot], colors[n], label=labels[n])
-                if plot_std:
-                    plt.fill_between(np.arange(t_plot), bandit.arm_quantile_R['mean'][a,0:t_plot]-np.sqrt(bandit.arm_quantile_R['var'][a,0:t_plot]), bandit.arm_quantile_R['mean'][a,0:t_plot]+np.sqrt(bandit.arm_quantile_R['var'][a,0:t_plot]),alpha=0.5, facecolor=colors[n])
+        fig, ax = plt.subplots()
+        arm_quantile_mean=[bandits[n].arm_quantile_R['mean'][a,0:t_plot] for n in quantile_bandits]
+        arm_quantile_std=[np.sqrt(bandits[n].arm_quantile_R['var'][a,0:t_plot]) for n in quantile_bandits] if plot_std else []
+        plot_curves(ax, x, arm_quantile_mean, arm_quantile_std, quantile_colors, quantile_labels)
         plt.ylabel(r'$P(\mu_a<x)\leq \alpha $')
         plt.xlabel('t')
         plt.title('Averaged Action Quantiles for arm {}'.format(a))
         plt.xlim([0, t_plot-1])
         legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-        if plot_save is None: 
-            plt.show()
-        else:
-            plt.savefig(plot_save+'/action_quantile_{}_std{}.pdf'.format(a,str(plot_std)), format='pdf', bbox_inches='tight')
-            plt.close()
+        plot_show_or_save(fig, plot_save, 'action_quantile_{}_std{}.pdf'.format(a,str(plot_std)))
 
 # Bandit Quantiles plotting function: correct action quantile percentages
 def bandits_plot_action_quantile_correct(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
@@ -386,21 +584,19 @@ def bandits_plot_action_quantile_correct(bandits, colors, labels, t_plot, plot_s
         Rets:
             None
     """
+    # Time instants to plot
+    x=np.arange(t_plot)
     # Correct argmax(action_quantile)
-    plt.figure()
-    for (n,bandit) in enumerate(bandits):
-        if isinstance(bandit,BanditQuantiles):
-            plt.plot(np.arange(t_plot), (bandit.arm_quantile_R['mean'].argmax(axis=0)==(bandit.A-1)).astype(int), colors[n], label=labels[n])
+    fig, ax = plt.subplots()
+    quantile_bandits=[n for (n,bandit) in enumerate(bandits) if isinstance(bandit,BanditQuantiles)]
+    arm_quantile_correct=[(bandits[n].arm_quantile_R['mean'].argmax(axis=0)==(bandits[n].A-1)).astype(int) for n in quantile_bandits]
+    plot_curves(ax, x, arm_quantile_correct, [], [colors[n] for n in quantile_bandits], [labels[n] for n in quantile_bandits])
     plt.xlabel('t')
     plt.ylabel('% Correct')
     plt.title('Correct action predictive density percentage')
     plt.xlim([0, t_plot-1])
     legend = plt.legend(bbox_to_anchor=(1.05,1.05), loc='upper left', ncol=1, shadow=True)
-    if plot_save is None: 
-        plt.show()
-    else:
-        plt.savefig(plot_save+'/action_quantile_correct_std'+str(plot_std)+'.pdf', format='pdf', bbox_inches='tight')
-        plt.close()        
+    plot_show_or_save(fig, plot_save, 'action_quantile_correct_std'+str(plot_std)+'.pdf')        
 
 # Bandit plotting function: all
 def bandits_plot_all(bandits, colors, labels, t_plot, plot_std=True, plot_save=None):
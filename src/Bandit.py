@@ -2,21 +2,148 @@
 
 # Imports: python modules
 import abc
+import copy
+import io
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 import scipy.stats as stats
 
 ######## Helper functions ########
-def online_update_mean_var(r, new_instance, this_mean, this_m2):
-    this_delta=new_instance - this_mean
-    new_mean=this_mean+this_delta/r
-    new_m2=this_m2+this_delta*(new_instance-new_mean)
+def online_update_mean_var(r, new_instance, this_R):
+    """ Update, in place, the mean and variance over realizations with a new realization (Welford's algorithm)
+    Args:
+        r: number of realizations, including the new one
+        new_instance: the new realization
+        this_R: dictionary with the 'mean', 'm2' and 'var' arrays to update
+    """
+    # this_delta/r, the mean's update
+    this_delta=new_instance - this_R['mean']
+    this_delta/=r
+    this_R['mean']+=this_delta
+    # (new_instance-old_mean)*(new_instance-new_mean) = r*(r-1)*(this_delta/r)**2
+    np.square(this_delta, out=this_delta)
+    this_delta*=r*(r-1)
+    this_R['m2']+=this_delta
 
     if r < 2:
-        new_var=np.nan
+        this_R['var'].fill(np.nan)
+    else:
+        np.divide(this_R['m2'], r-1, out=this_R['var'])
+
+def realizations_array(shape, memmap_dir=None, name=None):
+    """ Allocate the (single precision) array where all realizations of a quantity are kept
+    Args:
+        shape: shape of the array, realizations first
+        memmap_dir: directory where to back the array with a memory-mapped .npy file, created if needed (None to keep it in memory)
+        name: name of the quantity (and of its file)
+    Rets:
+        all_R: zero-initialized array (or memory map)
+    """
+    if memmap_dir is None:
+        return np.zeros(shape, dtype=np.float32)
+    else:
+        # Only the pages being written or reduced are resident, so R is not bounded by memory
+        os.makedirs(memmap_dir, exist_ok=True)
+        return np.lib.format.open_memmap(memmap_dir+'/'+name+'.npy', mode='w+', dtype=np.float32, shape=shape)
+
+def batch_mean_var(this_R, block_R=32):
+    """ Compute, in place, the mean and variance over all realizations, reusing the mean for the variance
+    Args:
+        this_R: dictionary with the 'all' realizations array, and the 'mean' and 'var' arrays to fill
+        block_R: number of realizations to process at once
+    """
+    this_R['all'].mean(axis=0, dtype=np.float64, out=this_R['mean'])
+    # Squared deviations from the already computed mean (np.var would compute the mean again), a block of realizations at a time
+    this_R['var'].fill(0)
+    for r in np.arange(0, this_R['all'].shape[0], block_R):
+        this_deviations=this_R['all'][r:r+block_R]-this_R['mean']
+        np.square(this_deviations, out=this_deviations)
+        this_R['var']+=this_deviations.sum(axis=0)
+    this_R['var']/=this_R['all'].shape[0]
+
+def stats_distribution(name):
+    """ The scipy.stats distribution with the given name """
+    return getattr(stats, name)
+
+class RealizationPickler(pickle.Pickler):
+    """ Pickler for the bandits sent to realization worker processes
+        scipy.stats distributions are pickled by name: otherwise, workers would get copies with their own random state, unaffected by each realization's seed
+    """
+    def reducer_override(self, obj):
+        if isinstance(obj, (stats.rv_continuous, stats.rv_discrete)) and getattr(stats, obj.name, None) is obj:
+            return (stats_distribution, (obj.name,))
+        return NotImplemented
+
+# Bandit (and its execution arguments) executed by each realization worker process
+worker_bandit=None
+worker_t_max=None
+worker_context=None
+
+def init_realization_worker(bandit_pickle, t_max, context):
+    """ Initialize a realization worker process with its own copy of the bandit
+    Args:
+        bandit_pickle: pickled bandit to execute
+        t_max: maximum execution time for the bandit
+        context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
+    """
+    global worker_bandit, worker_t_max, worker_context
+    worker_bandit=pickle.loads(bandit_pickle)
+    worker_t_max=t_max
+    worker_context=context
+
+def execute_realization(seed):
+    """ Execute one realization of the worker's bandit
+    Args:
+        seed: seed of the random number generator for this realization
+    Rets:
+        realization: dictionary with the bandit's per-realization attributes
+    """
+    worker_bandit.seed_realization(seed)
+    worker_bandit.execute(worker_t_max, worker_context)
+    return {attribute:getattr(worker_bandit, attribute) for attribute in worker_bandit.realization_attributes()}
+
+def execute_bandits(bandits, R, t_max, context=None, exec_type='sequential', n_workers=None, seed=None, memmap_dir=None):
+    """ Execute R realizations of a set of bandits, several bandits at the same time
+        Each bandit is driven by a thread, with its realizations distributed across its share of (at least 2) worker processes: up to n_workers//2 bandits run at once
+        Workers are then started from a fork server, which imports the calling script: guard its main code with if __name__ == '__main__'
+    Args:
+        bandits: bandit list
+        R: number of realizations to run
+        t_max: maximum execution time for the bandits
+        context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
+        exec_type: batch (keep data from all realizations) or sequential (update mean and variance of realizations data)
+        n_workers: number of worker processes shared by all bandits (None for all available CPUs, 1 to execute one bandit after the other in this process)
+        seed: seed for the realizations of all bandits (None to draw them from numpy's global random state)
+        memmap_dir: directory where to back batch realizations with memory-mapped files, a subdirectory per bandit (None to keep them in memory)
+    """
+    if n_workers is None:
+        n_workers=os.cpu_count()
+    # Independent seed per bandit
+    seeds=np.random.SeedSequence(seed).generate_state(len(bandits)) if seed is not None else [None]*len(bandits)
+    # Separate memory-mapped files per bandit
+    if memmap_dir is None:
+        memmap_dirs=[None]*len(bandits)
     else:
-        new_var=new_m2/(r-1)
+        memmap_dirs=[memmap_dir+'/bandit_{}'.format(n) for n in np.arange(len(bandits))]
 
-    return (new_mean, new_m2, new_var)
+    if n_workers==1 or R==1:
+        # Realizations in this process share numpy's global random state: one bandit after the other
+        for (bandit,bandit_seed,bandit_memmap_dir) in zip(bandits,seeds,memmap_dirs):
+            bandit.execute_realizations(R, t_max, context, exec_type, n_workers, bandit_seed, bandit_memmap_dir)
+    else:
+        # Worker processes per bandit are at least 2, so that realizations never run in the threads (sharing numpy's global random state)
+        # Hence, limit how many bandits run at once, so that all of them never use more than n_workers processes
+        concurrent_bandits=max(1, min(len(bandits), n_workers//2))
+        bandit_workers=n_workers//concurrent_bandits
+        with ThreadPoolExecutor(max_workers=concurrent_bandits) as executor:
+            executions=[executor.submit(bandit.execute_realizations, R, t_max, context, exec_type, bandit_workers, bandit_seed, bandit_memmap_dir) for (bandit,bandit_seed,bandit_memmap_dir) in zip(bandits,seeds,memmap_dirs)]
+            # Wait for all (and raise any of their errors)
+            for execution in executions:
+                execution.result()
 
 ######## Class definition ########
 class Bandit(abc.ABC,object):
@@ -26,7 +153,9 @@ class Bandit(abc.ABC,object):
         A: size of the multi-armed bandit 
         reward_function: dictionary with information about the reward distribution and its parameters is provided
         context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
+        rng: random number generator of the bandit (seeded per realization)
         actions: the actions that the bandit takes (per realization) as A by t_max array
+        arms_played: the arm played at each time instant (per realization) as t_max array (-1 if none was played)
         rewards: rewards obtained by each arm of the bandit (per realization) as A by t_max array
         regrets: regret of the bandit (per realization) as t_max array
         cumregrets: cumulative regret of the bandit (per realization) as t_max array
@@ -50,9 +179,12 @@ class Bandit(abc.ABC,object):
         self.A=A
         self.reward_function=reward_function
         self.context=None
+        # Random number generator, seeded from numpy's global random state (so that np.random.seed still applies)
+        self.rng=np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
                 
         # Per realization
         self.actions=None
+        self.arms_played=None
         self.rewards=None
         self.regrets=None
         self.cumregrets=None
@@ -100,7 +232,7 @@ class Bandit(abc.ABC,object):
         #### SIMULATED DATA SETS
         elif self.reward_function['type'] == 'bernoulli':
             # For Bernoulli distribution: expected value is \theta
-            self.rewards[a,t]=self.reward_function['dist'].rvs(self.reward_function['theta'][a])
+            self.rewards[a,t]=self.rng.binomial(1, self.reward_function['theta'][a])
         
         elif self.reward_function['type'] == 'linear_gaussian':
             if 'dynamics' in self.reward_function:
@@ -130,7 +262,8 @@ class Bandit(abc.ABC,object):
             else:
                 # For logistic function, we have Bernoulli distribution with expected value x^\top\theta
                 xTheta=np.einsum('dt,td->t', np.reshape(self.context[:,t], (self.d_context, t.size)), np.reshape(self.reward_function['theta'][a], (t.size, self.d_context)))
-            self.rewards[a,t]=stats.bernoulli.rvs(np.exp(xTheta)/(1+np.exp(xTheta)))
+            # xTheta is always a 1-D array: draw with the shape of t, so that a single time instant gets a scalar reward
+            self.rewards[a,t]=self.rng.binomial(1, np.reshape(np.exp(xTheta)/(1+np.exp(xTheta)), np.shape(t)))
         # TODO: Add other reward functions
         else:
             raise ValueError('Reward function={} not implemented yet'.format(self.reward_function))
@@ -161,8 +294,8 @@ class Bandit(abc.ABC,object):
 
         #### SIMULATED DATA SETS
         elif self.reward_function['type'] == 'bernoulli':
-            # For Bernoulli distribution: expected value is \theta
-            self.true_expected_rewards=self.reward_function['theta'][:,None]*np.ones(self.rewards.shape[1])
+            # For Bernoulli distribution: expected value is \theta (a read-only view, constant over time)
+            self.true_expected_rewards=np.broadcast_to(self.reward_function['theta'][:,None], (self.A,self.rewards.shape[1]))
         elif self.reward_function['type'] == 'linear_gaussian':
             if 'dynamics' in self.reward_function:
                 # For contextual linear Gaussian bandit, expected value is dot product of context and parameters \theta
@@ -185,14 +318,88 @@ class Bandit(abc.ABC,object):
         else:
             raise ValueError('Reward function={} not implemented yet'.format(self.reward_function))
 
+    def realization_attributes(self):
+        """ Names of the attributes that the bandit computes per realization
+        Args:
+            None
+        Rets:
+            attributes: list of attribute names
+        """
+        return ['actions', 'rewards', 'regrets', 'cumregrets', 'rewards_expected', 'true_expected_rewards']
+
+    def seed_realization(self, seed):
+        """ Seed the random number generators (the bandit's and numpy's global one) for a realization
+        Args:
+            seed: seed of the realization
+        """
+        np.random.seed(seed)
+        self.rng=np.random.default_rng(seed)
+
+    def realizations(self, R, t_max, context=None, n_workers=1, seed=None):
+        """ Execute R realizations of the bandit, yielding after each of them (in order)
+            Once yielded, the per-realization attributes of the bandit hold the results of realization r
+            Realizations are independent, so they are distributed across n_workers processes
+        Args:
+            R: number of realizations to run
+            t_max: maximum execution time for the bandit
+            context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
+            n_workers: number of worker processes (1, the default, to execute in this process; None for all available CPUs)
+            seed: seed for the realizations (None to draw them from numpy's global random state)
+        Rets:
+            r: index of the executed realization
+        """
+        if n_workers is None:
+            n_workers=os.cpu_count()
+        # No more workers than realizations: short runs do not pay for starting idle processes
+        n_workers=min(n_workers, R)
+
+        # Different random seed per realization
+        if seed is None:
+            seeds=np.random.randint(np.iinfo(np.int32).max, size=R)
+        else:
+            seeds=np.random.SeedSequence(seed).generate_state(R)
+
+        if n_workers==1:
+            # Execute all realizations in this process
+            for r in np.arange(R):
+                print('Executing realization {}'.format(r))
+                if seed is None:
+                    # Keep using numpy's global random state as is
+                    self.rng=np.random.default_rng(seeds[r])
+                else:
+                    self.seed_realization(seeds[r])
+                self.execute(t_max, context)
+                yield r
+        else:
+            # Workers get a copy of the bandit, without results over realizations
+            bandit=copy.copy(self)
+            bandit.__dict__={key:value for (key,value) in self.__dict__.items() if not key.endswith('_R')}
+            bandit_pickle=io.BytesIO()
+            RealizationPickler(bandit_pickle).dump(bandit)
+
+            # Forking while other threads run (e.g. within execute_bandits) copies any lock they hold into the workers, which may then deadlock: start workers from a fork server instead
+            mp_context=None
+            if threading.active_count()>1:
+                mp_context=multiprocessing.get_context('forkserver')
+                # With numpy and scipy already imported by the fork server, so that workers start fast
+                mp_context.set_forkserver_preload(['numpy', 'scipy.stats'])
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context, initializer=init_realization_worker, initargs=(bandit_pickle.getvalue(), t_max, context)) as executor:
+                for (r,realization) in enumerate(executor.map(execute_realization, seeds, chunksize=max(1, R//(4*n_workers)))):
+                    print('Executed realization {}'.format(r))
+                    self.__dict__.update(realization)
+                    yield r
+
     @abc.abstractmethod
-    def execute_realizations(self, R, t_max, context=None, exec_type='sequential'):
+    def execute_realizations(self, R, t_max, context=None, exec_type='sequential', n_workers=1, seed=None, memmap_dir=None):
         """ Execute R realizations of the bandit
         Args:
             R: number of realizations to run
             t_max: maximum execution time for the bandit
             context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
             exec_type: batch (keep data from all realizations) or sequential (update mean and variance of realizations data)
+            n_workers: number of worker processes to execute realizations with (1, the default, to execute in this process; None for all available CPUs)
+            seed: seed for the realizations (None to draw them from numpy's global random state)
+            memmap_dir: directory where to back batch realizations with memory-mapped .npy files (None to keep them in memory)
         """
         
     @abc.abstractmethod
@@ -41,14 +41,26 @@ class BanditQuantiles(Bandit):
         self.reward_prior=reward_prior
         # Quantile computation strategy
         self.quantile_info=quantile_info
+
+    def realization_attributes(self):
+        """ Names of the attributes that the bandit computes per realization
+        Args:
+            None
+        Rets:
+            attributes: list of attribute names
+        """
+        return super().realization_attributes()+['arm_quantile']
         
-    def execute_realizations(self, R, t_max, context=None, exec_type='sequential'):
+    def execute_realizations(self, R, t_max, context=None, exec_type='sequential', n_workers=1, seed=None, memmap_dir=None):
         """ Execute R realizations of the bandit
         Args:
             R: number of realizations to run
             t_max: maximum execution time for the bandit
             context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
             exec_type: batch (keep data from all realizations) or sequential (update mean and variance of realizations data)
+            n_workers: number of worker processes to execute realizations with (1, the default, to execute in this process; None for all available CPUs)
+            seed: seed for the realizations (None to draw them from numpy's global random state)
+            memmap_dir: directory where to back batch realizations with memory-mapped .npy files (None to keep them in memory)
         """
 
         # Allocate overall variables
@@ -60,29 +72,26 @@ class BanditQuantiles(Bandit):
             self.actions_R={'mean':np.zeros((self.A,t_max)), 'm2':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
             self.arm_quantile_R={'mean':np.zeros((self.A,t_max)), 'm2':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
         elif exec_type =='batch':
-            self.rewards_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.regrets_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.cumregrets_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.rewards_expected_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.actions_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.arm_quantile_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            # All realizations are kept in single precision (in memory, or memory-mapped to files)
+            self.rewards_R={'all':realizations_array((R,1,t_max), memmap_dir, 'rewards'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.regrets_R={'all':realizations_array((R,1,t_max), memmap_dir, 'regrets'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.cumregrets_R={'all':realizations_array((R,1,t_max), memmap_dir, 'cumregrets'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.rewards_expected_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'rewards_expected'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.actions_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'actions'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.arm_quantile_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'arm_quantile'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
         else:
             raise ValueError('Execution type={} not implemented'.format(exec_type))
             
         # Execute all
-        for r in np.arange(R):
-            # Run one realization
-            print('Executing realization {}'.format(r))
-            self.execute(t_max, context)
-
+        for r in self.realizations(R, t_max, context, n_workers, seed):
             if exec_type == 'sequential':
                 # Update overall mean and variance sequentially
-                self.rewards_R['mean'], self.rewards_R['m2'], self.rewards_R['var']=online_update_mean_var(r+1, self.rewards.sum(axis=0), self.rewards_R['mean'], self.rewards_R['m2'])
-                self.regrets_R['mean'], self.regrets_R['m2'], self.regrets_R['var']=online_update_mean_var(r+1, self.regrets, self.regrets_R['mean'], self.regrets_R['m2'])
-                self.cumregrets_R['mean'], self.cumregrets_R['m2'], self.cumregrets_R['var']=online_update_mean_var(r+1, self.cumregrets, self.cumregrets_R['mean'], self.cumregrets_R['m2'])
-                self.rewards_expected_R['mean'], self.rewards_expected_R['m2'], self.rewards_expected_R['var']=online_update_mean_var(r+1, self.rewards_expected, self.rewards_expected_R['mean'], self.rewards_expected_R['m2'])
-                self.actions_R['mean'], self.actions_R['m2'], self.actions_R['var']=online_update_mean_var(r+1, self.actions, self.actions_R['mean'], self.actions_R['m2'])
-                self.arm_quantile_R['mean'], self.arm_quantile_R['m2'], self.arm_quantile_R['var']=online_update_mean_var(r+1, self.arm_quantile, self.arm_quantile_R['mean'], self.arm_quantile_R['m2'])
+                online_update_mean_var(r+1, self.rewards.sum(axis=0), self.rewards_R)
+                online_update_mean_var(r+1, self.regrets, self.regrets_R)
+                online_update_mean_var(r+1, self.cumregrets, self.cumregrets_R)
+                online_update_mean_var(r+1, self.rewards_expected, self.rewards_expected_R)
+                online_update_mean_var(r+1, self.actions, self.actions_R)
+                online_update_mean_var(r+1, self.arm_quantile, self.arm_quantile_R)
             else:
                 self.rewards_R['all'][r,0,:]=self.rewards.sum(axis=0)
                 self.regrets_R['all'][r,0,:]=self.regrets
@@ -92,19 +101,13 @@ class BanditQuantiles(Bandit):
                 self.arm_quantile_R['all'][r,:,:]=self.arm_quantile
                 
         if exec_type == 'batch':
-            # Compute sufficient statistics
-            self.rewards_R['mean']=self.rewards_R['all'].mean(axis=0)
-            self.rewards_R['var']=self.rewards_R['all'].var(axis=0)
-            self.regrets_R['mean']=self.regrets_R['all'].mean(axis=0)
-            self.regrets_R['var']=self.regrets_R['all'].var(axis=0)
-            self.cumregrets_R['mean']=self.cumregrets_R['all'].mean(axis=0)
-            self.cumregrets_R['var']=self.cumregrets_R['all'].var(axis=0)
-            self.rewards_expected_R['mean']=self.rewards_expected_R['all'].mean(axis=0)
-            self.rewards_expected_R['var']=self.rewards_expected_R['all'].var(axis=0)
-            self.actions_R['mean']=self.actions_R['all'].mean(axis=0)
-            self.actions_R['var']=self.actions_R['all'].var(axis=0)
-            self.arm_quantile_R['mean']=self.arm_quantile_R['all'].mean(axis=0)
-            self.arm_quantile_R['var']=self.arm_quantile_R['all'].var(axis=0)
+            # Compute sufficient statistics, in double precision into the preallocated arrays
+            batch_mean_var(self.rewards_R)
+            batch_mean_var(self.regrets_R)
+            batch_mean_var(self.cumregrets_R)
+            batch_mean_var(self.rewards_expected_R)
+            batch_mean_var(self.actions_R)
+            batch_mean_var(self.arm_quantile_R)
                 
     def execute(self, t_max, context=None):
         """ Execute the Bayesian bandit
@@ -121,6 +124,7 @@ class BanditQuantiles(Bandit):
         
         # Initialize attributes
         self.actions=np.zeros((self.A,t_max))
+        self.arms_played=np.full(t_max, -1)
         self.rewards=np.zeros((self.A,t_max))
         self.rewards_expected=np.zeros((self.A,t_max))
         self.arm_quantile=np.zeros((self.A,t_max))
@@ -139,6 +143,8 @@ class BanditQuantiles(Bandit):
             # Pick next action, by maximum of quantiles 
             action = self.arm_quantile[:,t].argmax()
             self.actions[action,t]=1.
+            # Keep played arm index, for posterior updates
+            self.arms_played[t]=action
 
             # Play selected arm
             self.play_arm(action, t)
@@ -146,6 +152,7 @@ class BanditQuantiles(Bandit):
             if np.isnan(self.rewards[action,t]):
                 # This instance has not been played, and no parameter update (e.g. for logged data)
                 self.actions[action,t]=0.
+                self.arms_played[t]=-1
             else:
                 # Update parameter posterior
                 self.update_reward_posterior(t)
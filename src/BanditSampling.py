@@ -4,6 +4,51 @@
 # Imports: other modules
 from Bandit import * 
 
+######## Helper functions ########
+def p_fa_tGaussian(w_opt, mean_others, var_others):
+    """ Probability of "false alarm", with a truncated Gaussian approximation to the suboptimal arms' predictive density
+    Args:
+        w_opt: predictive density of the optimal action estimate
+        mean_others: predictive density mean of the suboptimal arms
+        var_others: predictive density variance of the suboptimal arms
+    Rets:
+        p_fa: average of per (suboptimal) arm false alarm probability
+    """
+    # Sufficient statistics for truncated Gaussian approximation
+    xi=(w_opt-mean_others)/np.sqrt(var_others)
+    alpha=(-mean_others)/np.sqrt(var_others)
+    beta=(1-mean_others)/np.sqrt(var_others)
+    # Compute average of per (suboptimal) arm false alarm probability
+    return (1-(stats.norm.cdf(xi)-stats.norm.cdf(alpha))/(stats.norm.cdf(beta)-stats.norm.cdf(alpha))).sum()/mean_others.size
+
+def p_fa_Markov(w_opt, mean_others, var_others):
+    """ Probability of "false alarm", with Markov's inequality
+    Args:
+        w_opt: predictive density of the optimal action estimate
+        mean_others: predictive density mean of the suboptimal arms
+        var_others: predictive density variance of the suboptimal arms (unused)
+    Rets:
+        p_fa: average of per (suboptimal) arm false alarm probability
+    """
+    # Compute average of per (suboptimal) arm false alarm probability
+    return (mean_others/w_opt).sum()/mean_others.size
+
+def p_fa_Chebyshev(w_opt, mean_others, var_others):
+    """ Probability of "false alarm", with Chebyshev's inequality
+    Args:
+        w_opt: predictive density of the optimal action estimate
+        mean_others: predictive density mean of the suboptimal arms
+        var_others: predictive density variance of the suboptimal arms
+    Rets:
+        p_fa: average of per (suboptimal) arm false alarm probability
+    """
+    delta=w_opt - mean_others
+    # Compute average of per (suboptimal) arm false alarm probability
+    return (var_others/(2*np.power(delta,2))).sum()/mean_others.size
+
+# Probability of "false alarm" computations, by arm_predictive_policy['Pfa']
+p_fa_functions={'tGaussian':p_fa_tGaussian, 'Markov':p_fa_Markov, 'Chebyshev':p_fa_Chebyshev}
+
 ######## Class definition ########
 class BanditSampling(Bandit):
     """ Abstract class for bandits with sampling policies
@@ -17,6 +62,7 @@ class BanditSampling(Bandit):
         arm_predictive_policy: how to compute arm predictive density and sampling policy
         arm_predictive_density: predictive density of each arm
         arm_N_samples: number of candidate arm samples to draw at each time instant
+        p_fa_function: probability of "false alarm" computation of infPfa policies
     """
     
     def __init__(self, A, reward_function, reward_prior, arm_predictive_policy):
@@ -36,14 +82,31 @@ class BanditSampling(Bandit):
         self.reward_prior=reward_prior
         # Arm predictive computation strategy
         self.arm_predictive_policy=arm_predictive_policy
+        # Resolve the probability of "false alarm" computation once, rather than per time instant
+        if self.arm_predictive_policy['sampling_type'] == 'infPfa':
+            if self.arm_predictive_policy['Pfa'] not in p_fa_functions:
+                raise ValueError('Invalid Pfa computation type={}'.format(self.arm_predictive_policy['Pfa']))
+            self.p_fa_function=p_fa_functions[self.arm_predictive_policy['Pfa']]
+
+    def realization_attributes(self):
+        """ Names of the attributes that the bandit computes per realization
+        Args:
+            None
+        Rets:
+            attributes: list of attribute names
+        """
+        return super().realization_attributes()+['arm_predictive_density', 'arm_N_samples']
         
-    def execute_realizations(self, R, t_max, context=None, exec_type='sequential'):
+    def execute_realizations(self, R, t_max, context=None, exec_type='sequential', n_workers=1, seed=None, memmap_dir=None):
         """ Execute R realizations of the bandit
         Args:
             R: number of realizations to run
             t_max: maximum execution time for the bandit
             context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
             exec_type: batch (keep data from all realizations) or sequential (update mean and variance of realizations data)
+            n_workers: number of worker processes to execute realizations with (1, the default, to execute in this process; None for all available CPUs)
+            seed: seed for the realizations (None to draw them from numpy's global random state)
+            memmap_dir: directory where to back batch realizations with memory-mapped .npy files (None to keep them in memory)
         """
 
         # Allocate overall variables
@@ -56,32 +119,29 @@ class BanditSampling(Bandit):
             self.arm_predictive_density_R={'mean':np.zeros((self.A,t_max)), 'm2':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
             self.arm_N_samples_R={'mean':np.zeros(t_max), 'm2':np.zeros(t_max), 'var':np.zeros(t_max)}
         elif exec_type =='batch':
-            self.rewards_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.regrets_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.cumregrets_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.rewards_expected_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.actions_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.arm_predictive_density_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.arm_predictive_density_var_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.arm_N_samples_R={'all':np.zeros((R,t_max)),'mean':np.zeros(t_max), 'var':np.zeros(t_max)}            
+            # All realizations are kept in single precision (in memory, or memory-mapped to files)
+            self.rewards_R={'all':realizations_array((R,1,t_max), memmap_dir, 'rewards'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.regrets_R={'all':realizations_array((R,1,t_max), memmap_dir, 'regrets'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.cumregrets_R={'all':realizations_array((R,1,t_max), memmap_dir, 'cumregrets'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.rewards_expected_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'rewards_expected'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.actions_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'actions'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.arm_predictive_density_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'arm_predictive_density'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.arm_predictive_density_var_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'arm_predictive_density_var'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.arm_N_samples_R={'all':realizations_array((R,t_max), memmap_dir, 'arm_N_samples'),'mean':np.zeros(t_max), 'var':np.zeros(t_max)}            
         else:
             raise ValueError('Execution type={} not implemented'.format(exec_type))
             
         # Execute all
-        for r in np.arange(R):
-            # Run one realization
-            print('Executing realization {}'.format(r))
-            self.execute(t_max, context)
-
+        for r in self.realizations(R, t_max, context, n_workers, seed):
             if exec_type == 'sequential':
                 # Update overall mean and variance sequentially
-                self.rewards_R['mean'], self.rewards_R['m2'], self.rewards_R['var']=online_update_mean_var(r+1, self.rewards.sum(axis=0), self.rewards_R['mean'], self.rewards_R['m2'])
-                self.regrets_R['mean'], self.regrets_R['m2'], self.regrets_R['var']=online_update_mean_var(r+1, self.regrets, self.regrets_R['mean'], self.regrets_R['m2'])
-                self.cumregrets_R['mean'], self.cumregrets_R['m2'], self.cumregrets_R['var']=online_update_mean_var(r+1, self.cumregrets, self.cumregrets_R['mean'], self.cumregrets_R['m2'])
-                self.rewards_expected_R['mean'], self.rewards_expected_R['m2'], self.rewards_expected_R['var']=online_update_mean_var(r+1, self.rewards_expected, self.rewards_expected_R['mean'], self.rewards_expected_R['m2'])
-                self.actions_R['mean'], self.actions_R['m2'], self.actions_R['var']=online_update_mean_var(r+1, self.actions, self.actions_R['mean'], self.actions_R['m2'])
-                self.arm_predictive_density_R['mean'], self.arm_predictive_density_R['m2'], self.arm_predictive_density_R['var']=online_update_mean_var(r+1, self.arm_predictive_density['mean'], self.arm_predictive_density_R['mean'], self.arm_predictive_density_R['m2'])
-                self.arm_N_samples_R['mean'], self.arm_N_samples_R['m2'], self.arm_N_samples_R['var']=online_update_mean_var(r+1, self.arm_N_samples, self.arm_N_samples_R['mean'], self.arm_N_samples_R['m2'])
+                online_update_mean_var(r+1, self.rewards.sum(axis=0), self.rewards_R)
+                online_update_mean_var(r+1, self.regrets, self.regrets_R)
+                online_update_mean_var(r+1, self.cumregrets, self.cumregrets_R)
+                online_update_mean_var(r+1, self.rewards_expected, self.rewards_expected_R)
+                online_update_mean_var(r+1, self.actions, self.actions_R)
+                online_update_mean_var(r+1, self.arm_predictive_density['mean'], self.arm_predictive_density_R)
+                online_update_mean_var(r+1, self.arm_N_samples, self.arm_N_samples_R)
             else:
                 self.rewards_R['all'][r,0,:]=self.rewards.sum(axis=0)
                 self.regrets_R['all'][r,0,:]=self.regrets
@@ -93,21 +153,14 @@ class BanditSampling(Bandit):
                 self.arm_N_samples_R['all'][r,:]=self.arm_N_samples
                 
         if exec_type == 'batch':
-            # Compute sufficient statistics
-            self.rewards_R['mean']=self.rewards_R['all'].mean(axis=0)
-            self.rewards_R['var']=self.rewards_R['all'].var(axis=0)
-            self.regrets_R['mean']=self.regrets_R['all'].mean(axis=0)
-            self.regrets_R['var']=self.regrets_R['all'].var(axis=0)
-            self.cumregrets_R['mean']=self.cumregrets_R['all'].mean(axis=0)
-            self.cumregrets_R['var']=self.cumregrets_R['all'].var(axis=0)
-            self.rewards_expected_R['mean']=self.rewards_expected_R['all'].mean(axis=0)
-            self.rewards_expected_R['var']=self.rewards_expected_R['all'].var(axis=0)
-            self.actions_R['mean']=self.actions_R['all'].mean(axis=0)
-            self.actions_R['var']=self.actions_R['all'].var(axis=0)
-            self.arm_predictive_density_R['mean']=self.arm_predictive_density_R['all'].mean(axis=0)
-            self.arm_predictive_density_R['var']=self.arm_predictive_density_R['all'].var(axis=0)
-            self.arm_N_samples_R['mean']=self.arm_N_samples_R['all'].mean(axis=0)
-            self.arm_N_samples_R['var']=self.arm_N_samples_R['all'].var(axis=0)
+            # Compute sufficient statistics, in double precision into the preallocated arrays
+            batch_mean_var(self.rewards_R)
+            batch_mean_var(self.regrets_R)
+            batch_mean_var(self.cumregrets_R)
+            batch_mean_var(self.rewards_expected_R)
+            batch_mean_var(self.actions_R)
+            batch_mean_var(self.arm_predictive_density_R)
+            batch_mean_var(self.arm_N_samples_R)
                 
     def execute(self, t_max, context=None):
         """ Execute the Bayesian bandit
@@ -124,6 +177,7 @@ class BanditSampling(Bandit):
         
         # Initialize attributes
         self.actions=np.zeros((self.A,t_max))
+        self.arms_played=np.full(t_max, -1)
         self.rewards=np.zeros((self.A,t_max))
         self.rewards_expected=np.zeros((self.A,t_max))
         self.arm_predictive_density={'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
@@ -132,36 +186,57 @@ class BanditSampling(Bandit):
         # Initialize reward posterior
         self.init_reward_posterior()
         
+        # Bind per-step methods and (updated in place) arrays to locals, to avoid repeated lookups within the time loop
+        compute_arm_predictive_density=self.compute_arm_predictive_density
+        compute_arm_N_samples=self.compute_arm_N_samples
+        play_arm=self.play_arm
+        update_reward_posterior=self.update_reward_posterior
+        actions=self.actions
+        arms_played=self.arms_played
+        rewards=self.rewards
+        arm_predictive_density_mean=self.arm_predictive_density['mean']
+        arm_N_samples=self.arm_N_samples
+        # Static number of candidate arm samples does not depend on the data, so set it once for all time instants
+        static_N_samples=self.arm_predictive_policy['sampling_type'] == 'static'
+        if static_N_samples:
+            arm_N_samples[:]=self.arm_predictive_policy['arm_N_samples']
+        # Thompson sampling (one posterior sample per arm, one candidate arm): the predictive density is the indicator of the best sampled arm, so play it directly
+        thompson_sampling=static_N_samples and self.arm_predictive_policy['arm_N_samples'] == 1 and self.arm_predictive_policy.get('MC_type') in ['MC_arms', 'MC_rewards'] and self.arm_predictive_policy.get('M') == 1
+        
         # Execute the bandit for each time instant
         print('Start running bandit')
         for t in np.arange(t_max):
             #print('Running time instant {}'.format(t))
             
             # Compute predictive density for each arm
-            self.compute_arm_predictive_density(t)
+            compute_arm_predictive_density(t)
 
             # Compute number of candidate arm samples, based on sampling strategy
-            self.arm_N_samples[t]=self.compute_arm_N_samples(t)
+            if not static_N_samples:
+                arm_N_samples[t]=compute_arm_N_samples(t)
             
             # Pick next action
-            if self.arm_N_samples[t] == np.inf:
+            if thompson_sampling or arm_N_samples[t] == np.inf:
                 # Pick maximum 
-                action = self.arm_predictive_density[:,t].argmax()
-                self.actions[action,t]=1.
+                action = arm_predictive_density_mean[:,t].argmax()
+                actions[action,t]=1.
             else:
-                # SAMPLE arm_N_samples and pick the most likely action                
-                self.actions[np.random.multinomial(1,self.arm_predictive_density['mean'][:,t], size=int(self.arm_N_samples[t])).sum(axis=0).argmax(),t]=1
-                action = np.where(self.actions[:,t]==1)[0][0]
+                # SAMPLE arm_N_samples and pick the most likely action (counting sampled arms, without a per-sample one-hot matrix)
+                action = np.bincount(self.rng.choice(self.A, size=int(arm_N_samples[t]), p=arm_predictive_density_mean[:,t]), minlength=self.A).argmax()
+                actions[action,t]=1.
 
+            # Keep played arm index, for posterior updates
+            arms_played[t]=action
             # Play selected arm
-            self.play_arm(action, t)
+            play_arm(action, t)
 
-            if np.isnan(self.rewards[action,t]):
+            if np.isnan(rewards[action,t]):
                 # This instance has not been played, and no parameter update (e.g. for logged data)
-                self.actions[action,t]=0.
+                actions[action,t]=0.
+                arms_played[t]=-1
             else:
                 # Update parameter posterior
-                self.update_reward_posterior(t)
+                update_reward_posterior(t)
 
         print('Finished running bandit at {}'.format(t))
         # Compute expected rewards with true function
@@ -182,32 +257,24 @@ class BanditSampling(Bandit):
             n_samples=self.arm_predictive_policy['arm_N_samples']
         elif self.arm_predictive_policy['sampling_type'] == 'infPfa':
             # Function of inverse of probability of other arms being optimal (prob false alarm)
+            # Predictive density of each arm at time t
+            arm_mean=self.arm_predictive_density['mean'][:,t]
             # Optimal action estimate and its "weight"
-            a_opt=self.arm_predictive_density['mean'][:,t].argmax()
-            w_opt=self.arm_predictive_density['mean'][a_opt,t]
-
-            # Probability of "false alarm" computation:
-            if self.arm_predictive_policy['Pfa'] == 'tGaussian':
-                # Sufficient statistics for truncated Gaussian approximation
-                xi=(w_opt-self.arm_predictive_density['mean'][np.arange(self.A)!=a_opt,t])/np.sqrt(self.arm_predictive_density['var'][np.arange(self.A)!=a_opt,t])
-                alpha=(-self.arm_predictive_density['mean'][np.arange(self.A)!=a_opt,t])/np.sqrt(self.arm_predictive_density['var'][np.arange(self.A)!=a_opt,t])
-                beta=(1-self.arm_predictive_density['mean'][np.arange(self.A)!=a_opt,t])/np.sqrt(self.arm_predictive_density['var'][np.arange(self.A)!=a_opt,t])
-                # Compute average of per (suboptimal) arm false alarm probability
-                p_fa=(1-(stats.norm.cdf(xi)-stats.norm.cdf(alpha))/(stats.norm.cdf(beta)-stats.norm.cdf(alpha))).sum()/(self.A-1)
-            elif self.arm_predictive_policy['Pfa'] == 'Markov':
-                # Markov's inequality
-                # Compute average of per (suboptimal) arm false alarm probability
-                p_fa=(self.arm_predictive_density['mean'][np.arange(self.A)!=a_opt,t]/w_opt).sum()/(self.A-1)
-            elif self.arm_predictive_policy['Pfa'] == 'Chebyshev':
-                # Chebyshev's inequality
-                delta=w_opt - self.arm_predictive_density['mean'][np.arange(self.A)!=a_opt,t]
-                # Compute average of per (suboptimal) arm false alarm probability
-                p_fa=(self.arm_predictive_density['var'][np.arange(self.A)!=a_opt,t]/(2*np.power(delta,2))).sum()/(self.A-1)
-            else:
-                raise ValueError('Invalid Pfa computation type={}'.format(self.arm_predictive_policy['Pfa']))
+            a_opt=arm_mean.argmax()
+            w_opt=arm_mean[a_opt]
+            # Suboptimal arms
+            a_others=np.arange(self.A)!=a_opt
+
+            # Probability of "false alarm" computation, as resolved at initialization
+            p_fa=self.p_fa_function(w_opt, arm_mean[a_others], self.arm_predictive_density['var'][a_others,t])
             
-            # Decide number of candidate samples, enforce at least 1 and limit max
-            n_samples=np.fmin(np.maximum(self.arm_predictive_policy['f(1/Pfa)'](1/p_fa),1), self.arm_predictive_policy['N_max'])
+            # Decide number of candidate samples, enforce at least 1 and limit max (with scalar min/max, rather than ufuncs)
+            n_samples=self.arm_predictive_policy['f(1/Pfa)'](1/p_fa)
+            if np.isnan(n_samples):
+                # An undefined (NaN) number of samples is limited to the max too
+                n_samples=self.arm_predictive_policy['N_max']
+            else:
+                n_samples=min(max(n_samples,1), self.arm_predictive_policy['N_max'])
         elif self.arm_predictive_policy['MC_type'] == 'argMax':
             # Infinite samples are equivalent to picking maximum
             n_samples=np.inf
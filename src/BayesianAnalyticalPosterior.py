@@ -19,6 +19,15 @@ class BayesianAnalyticalPosterior(object):
         rewards: rewards obtained by each arm of the bandit (per realization) as A by t_max array
     """
 
+    def init_reward_prior(self, reward_prior):
+        """ Keep the prior of the reward density, with its parameter arrays in double precision
+            Converted once, as the posterior copies and updates them in place
+
+        Args:
+            reward_prior: the assumed prior for the multi-armed bandit's reward function
+        """
+        self.reward_prior={key:(np.asarray(value, dtype=float) if isinstance(value, np.ndarray) else value) for (key,value) in reward_prior.items()}
+        
     def init_reward_posterior(self):
         """ Initialize the posterior of the reward density
             Following Bayesian approach with conjugate priors
@@ -26,8 +35,8 @@ class BayesianAnalyticalPosterior(object):
         Args:
             None
         """
-        # Initialize reward posterior with prior
-        self.reward_posterior=copy.deepcopy(self.reward_prior)
+        # Initialize reward posterior with prior: copy its parameter arrays (updated in place per time instant), but share its distribution
+        self.reward_posterior={key:(value.copy() if isinstance(value, np.ndarray) else value) for (key,value) in self.reward_prior.items()}
         
     def update_reward_posterior(self, t, update_type='sequential'):
         """ Update the posterior of the reward density, based on available information at time t
@@ -41,7 +50,7 @@ class BayesianAnalyticalPosterior(object):
         # Binomial/Bernoulli reward with beta conjugate prior
         if self.reward_function['type'] == 'bernoulli' and self.reward_prior['dist'].name == 'beta':
             if update_type=='sequential':
-                a = np.where(self.actions[:,t]==1)[0][0]
+                a = self.arms_played[t]
                 self.reward_posterior['alpha'][a]+=self.rewards[a,t]
                 self.reward_posterior['beta'][a]+=(1-self.rewards[a,t])
             elif update_type=='batch':
@@ -49,8 +58,9 @@ class BayesianAnalyticalPosterior(object):
                 s_t=np.nansum(self.rewards[:,:t+1], axis=1, keepdims=True)
                 # Number of trials up to t (included)
                 n_t=self.actions[:,:t+1].sum(axis=1, keepdims=True)
-                self.reward_posterior['alpha']=self.reward_prior['alpha']+s_t
-                self.reward_posterior['beta']=self.reward_prior['beta']+(n_t-s_t)
+                # Only the current posterior is kept: overwrite its arrays in place
+                np.add(self.reward_prior['alpha'], s_t, out=self.reward_posterior['alpha'])
+                np.add(self.reward_prior['beta'], n_t-s_t, out=self.reward_posterior['beta'])
             else:
                 raise ValueError('Invalid update computation type={}'.format(update_type))
         # Linear Gaussian reward with Normal Inverse Gamma conjugate prior
@@ -58,7 +68,7 @@ class BayesianAnalyticalPosterior(object):
             # Update parameter posterior based on observed data (if dynamic parameters, they have already been propagated)
             if update_type=='sequential':
                 # Played action
-                a = np.where(self.actions[:,t]==1)[0][0]
+                a = self.arms_played[t]
                 
                 # If unknown scale
                 if 'alpha' in self.reward_prior and 'beta' in self.reward_prior:
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 # Imports: python modules
+import scipy.special as special
 # Imports: other modules
 from BanditQuantiles import * 
 from BayesianAnalyticalPosterior import *
@@ -39,6 +40,8 @@ class BayesianBanditQuantiles(BanditQuantiles, BayesianAnalyticalPosterior):
         
         # Initialize
         super().__init__(A, reward_function, reward_prior, quantile_info)
+        # Keep prior hyperparameter arrays in double precision
+        self.init_reward_prior(reward_prior)
             
     def compute_arm_quantile(self, t):
         """ Method to compute the quantile values for each arm, based on available information at time t, which depends on posterior update type
@@ -71,8 +74,8 @@ class BayesianBanditQuantiles(BanditQuantiles, BayesianAnalyticalPosterior):
             ### Compute the quantiles, using the analytical quantile function
             # Bernoulli bandits with beta prior
             if self.reward_function['type'] == 'bernoulli' and self.reward_prior['dist'].name == 'beta':
-                # Quantile of updated beta
-                self.arm_quantile[:,[t]]=self.reward_posterior['dist'].ppf(1-self.quantile_info['alpha'][t], self.reward_posterior['alpha'], self.reward_posterior['beta'])
+                # Quantile of updated beta (its inverse regularized incomplete beta function, without scipy.stats' ppf dispatch overhead)
+                self.arm_quantile[:,[t]]=special.betaincinv(self.reward_posterior['alpha'], self.reward_posterior['beta'], 1-self.quantile_info['alpha'][t])
             
                 # Also, compute expected reward, which matches expected value of theta, as given by its Beta prior
                 self.rewards_expected[:,t]=(self.reward_posterior['alpha']/(self.reward_posterior['alpha']+self.reward_posterior['beta']))[:,0]
@@ -104,8 +107,8 @@ class BayesianBanditQuantiles(BanditQuantiles, BayesianAnalyticalPosterior):
             
             # Bernoulli bandits with beta prior
             if self.reward_function['type'] == 'bernoulli' and self.reward_prior['dist'].name == 'beta':
-                # Draw Bernoulli parameters, which match expected rewards
-                expected_reward_samples=self.reward_posterior['dist'].rvs(self.reward_posterior['alpha'], self.reward_posterior['beta'], size=(self.A,self.quantile_info['n_samples']))
+                # Draw Bernoulli parameters, which match expected rewards (with numpy's beta sampler directly)
+                expected_reward_samples=self.rng.beta(self.reward_posterior['alpha'], self.reward_posterior['beta'], size=(self.A,self.quantile_info['n_samples']))
                         
             # Contextual Linear Gaussian bandits with NIG prior
             elif self.reward_function['type'] == 'linear_gaussian' and self.reward_prior['dist'] == 'NIG':                        
@@ -33,6 +33,8 @@ class BayesianBanditSampling(BanditSampling, BayesianAnalyticalPosterior):
         
         # Initialize
         super().__init__(A, reward_function, reward_prior, arm_predictive_policy)
+        # Keep prior hyperparameter arrays in double precision
+        self.init_reward_prior(reward_prior)
             
     def compute_arm_predictive_density(self, t):
         """ Method to compute the predictive density of each arm, based on available information at time t:
@@ -86,15 +88,15 @@ class BayesianBanditSampling(BanditSampling, BayesianAnalyticalPosterior):
         ### Sample reward's parameters, given updated hyperparameters
         # Bernoulli bandits with beta prior
         if self.reward_function['type'] == 'bernoulli' and self.reward_prior['dist'].name == 'beta':
-            # Draw Bernoulli parameters
-            reward_params_samples=self.reward_posterior['dist'].rvs(self.reward_posterior['alpha'], self.reward_posterior['beta'], size=(self.A,self.arm_predictive_policy['M']))
+            # Draw Bernoulli parameters (with numpy's beta sampler directly, avoiding scipy.stats' rvs overhead)
+            reward_params_samples=self.rng.beta(self.reward_posterior['alpha'], self.reward_posterior['beta'], size=(self.A,self.arm_predictive_policy['M']))
             
             if self.arm_predictive_policy['MC_type'] == 'MC_expectedRewards' or self.arm_predictive_policy['MC_type'] == 'MC_arms':
                 # Compute expected rewards of sampled parameters
                 rewards_expected_samples=reward_params_samples
             elif self.arm_predictive_policy['MC_type'] == 'MC_rewards':
-                # Draw rewards given sampled parameters
-                rewards_samples=self.reward_function['dist'].rvs(reward_params_samples)
+                # Draw Bernoulli rewards given sampled parameters (as single precision uniforms below them, kept as booleans)
+                rewards_samples=self.rng.random(reward_params_samples.shape, dtype=np.float32)<reward_params_samples
                 
         # Contextual Linear Gaussian bandits with NIG prior
         elif self.reward_function['type'] == 'linear_gaussian' and self.reward_prior['dist'] == 'NIG':        
@@ -106,7 +108,7 @@ class BayesianBanditSampling(BanditSampling, BayesianAnalyticalPosterior):
                     sigma_samples=stats.invgamma.rvs(self.reward_posterior['alpha'][a], scale=self.reward_posterior['beta'][a], size=(1,self.arm_predictive_policy['M']))
                 else:
                     # Variance is known
-                    sigma_samples=self.reward_function['sigma'][a]**2*np.ones((1,self.arm_predictive_policy['M']))
+                    sigma_samples=np.broadcast_to(self.reward_function['sigma'][a]**2, (1,self.arm_predictive_policy['M']))
 
                 # Then multivariate Gaussian parameters
                 reward_params_samples=self.reward_posterior['theta'][a,:][:,None]+np.sqrt(sigma_samples)*(stats.multivariate_normal.rvs(cov=self.reward_posterior['Sigma'][a,:,:], size=self.arm_predictive_policy['M']).reshape(self.arm_predictive_policy['M'],self.d_context).T)
@@ -126,15 +128,15 @@ class BayesianBanditSampling(BanditSampling, BayesianAnalyticalPosterior):
         if self.arm_predictive_policy['MC_type'] == 'MC_rewards':
             # Monte Carlo integration over reward samples
             # Mean times reward is maximum
-            self.arm_predictive_density['mean'][:,t]=((rewards_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).mean(axis=1)
-            # Variance of times reward is maximum
-            self.arm_predictive_density['var'][:,t]=((rewards_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).var(axis=1)
+            np.divide(np.bincount(rewards_samples.argmax(axis=0), minlength=self.A), rewards_samples.shape[1], out=self.arm_predictive_density['mean'][:,t])
+            # Variance of times reward is maximum: variance of a Bernoulli indicator, p(1-p)
+            np.multiply(self.arm_predictive_density['mean'][:,t], 1-self.arm_predictive_density['mean'][:,t], out=self.arm_predictive_density['var'][:,t])
             # Also, compute expected rewards
-            self.rewards_expected[:,t]=rewards_samples.mean(axis=1)
+            rewards_samples.mean(axis=1, out=self.rewards_expected[:,t])
             
         elif self.arm_predictive_policy['MC_type'] == 'MC_expectedRewards':
             # First, compute expectation over rewards
-            self.rewards_expected[:,t]=rewards_expected_samples.mean(axis=1)
+            rewards_expected_samples.mean(axis=1, out=self.rewards_expected[:,t])
             
             # Then, Monte Carlo integration over expected reward
             # Arm for which expected reward is maximum
@@ -144,11 +146,11 @@ class BayesianBanditSampling(BanditSampling, BayesianAnalyticalPosterior):
         elif self.arm_predictive_policy['MC_type'] == 'MC_arms':
             # Monte Carlo integration over arm samples
             # Mean times expected reward is maximum
-            self.arm_predictive_density['mean'][:,t]=((rewards_expected_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).mean(axis=1)
-            # Variance of times expected reward is maximum
-            self.arm_predictive_density['var'][:,t]=((rewards_expected_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).var(axis=1)
+            np.divide(np.bincount(rewards_expected_samples.argmax(axis=0), minlength=self.A), rewards_expected_samples.shape[1], out=self.arm_predictive_density['mean'][:,t])
+            # Variance of times expected reward is maximum: variance of a Bernoulli indicator, p(1-p)
+            np.multiply(self.arm_predictive_density['mean'][:,t], 1-self.arm_predictive_density['mean'][:,t], out=self.arm_predictive_density['var'][:,t])
             # Also, compute expected rewards            
-            self.rewards_expected[:,t]=rewards_expected_samples.mean(axis=1)
+            rewards_expected_samples.mean(axis=1, out=self.rewards_expected[:,t])
         else:
             raise ValueError('Arm predictive density computation type={} not implemented yet'.format(self.arm_predictive_policy['MC_type']))
 	
@@ -71,7 +71,7 @@ class MCBanditQuantiles(BanditQuantiles, MonteCarloPosterior):
                 # Propagated mean
                 theta_loc=np.einsum('adb,amb->amd', self.reward_function['dynamics_A'], self.reward_posterior['theta'])
                 # Draw from Gaussian (with resampled mean)
-                self.reward_posterior['theta']=theta_loc[np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a]+ np.einsum('adb,amb->amd', np.linalg.cholesky(self.reward_function['dynamics_C']), stats.norm.rvs(size=self.reward_posterior['theta'].shape))
+                self.reward_posterior['theta']=theta_loc[np.arange(self.A)[:,None],m_a]+ np.einsum('adb,amb->amd', np.linalg.cholesky(self.reward_function['dynamics_C']), stats.norm.rvs(size=self.reward_posterior['theta'].shape))
             
             # Linear mixing dynamics, with unknown parameters
             elif self.reward_function['dynamics']=='linear_mixing_unknown':
@@ -84,7 +84,7 @@ class MCBanditQuantiles(BanditQuantiles, MonteCarloPosterior):
                 if t>=2*self.reward_posterior['theta'].shape[2] and nu>0:
                     # We compute all sufficient statistics after resampling, to avoid computation of negligible (small weighted) streams
                     # Keep track of whole stream after resampling
-                    self.allTheta[:,:,:,:t+1]=self.allTheta[np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a,:,:t+1]
+                    self.allTheta[:,:,:,:t+1]=self.allTheta[np.arange(self.A)[:,None],m_a,:,:t+1]
       
                     # Data products
                     ZZtop=np.einsum('amdt,ambt->amdb', self.allTheta[:,:,:,0:t-1], self.allTheta[:,:,:,0:t-1])
@@ -129,7 +129,7 @@ class MCBanditQuantiles(BanditQuantiles, MonteCarloPosterior):
                 else:
                     # Propagate with priors over dynamics
                     # Propagated mean (resampled)
-                    theta_loc=np.einsum('adb,amb->amd', self.reward_prior['A_0'], self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a])
+                    theta_loc=np.einsum('adb,amb->amd', self.reward_prior['A_0'], self.reward_posterior['theta'][np.arange(self.A)[:,None],m_a])
                     # Draw from Gaussian
                     self.reward_posterior['theta']=theta_loc + np.einsum('adb,amb->amd', np.linalg.cholesky(self.reward_prior['C_0']), stats.norm.rvs(size=self.reward_posterior['theta'].shape))
             else:
@@ -165,7 +165,7 @@ class MCBanditQuantiles(BanditQuantiles, MonteCarloPosterior):
             # First, compute expected reward
             self.rewards_expected[:,t]=np.einsum('am, am->a', posterior_weights, expected_reward_samples)
             # Order samples
-            sorted_idx=[(np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int)),np.argsort(expected_reward_samples, axis=1)]
+            sorted_idx=(np.arange(self.A)[:,None],np.argsort(expected_reward_samples, axis=1))
             
             # Alpha computation
             if self.quantile_info['MC_alpha']=='alpha':
@@ -197,19 +197,19 @@ class MCBanditQuantiles(BanditQuantiles, MonteCarloPosterior):
             # Bernoulli bandits
             if self.reward_function['type'] == 'bernoulli':
                 # Draw Bernoulli parameters, which match expected rewards
-                expected_reward_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.quantile_info['n_samples']),dtype=int), n_a,0]
+                expected_reward_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None], n_a,0]
         
             # Contextual Linear Gaussian bandits
             elif self.reward_function['type'] == 'linear_gaussian':
                 # Draw theta parameters
-                theta_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.quantile_info['n_samples']),dtype=int), n_a]
+                theta_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None], n_a]
                 # Expected rewards are linear combination of context and parameters
                 expected_reward_samples=np.einsum('d, amd->am',self.context[:,t],theta_samples)
                 
             # Logistic bandits
             elif self.reward_function['type'] == 'logistic':
                 # Draw theta parameters
-                theta_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.quantile_info['n_samples']),dtype=int), n_a]
+                theta_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None], n_a]
                 
                 # Expected rewards are given by the logistic function of context and parameters
                 xTheta=np.einsum('d,amd->am', self.context[:,t], theta_samples)
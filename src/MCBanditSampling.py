@@ -89,7 +89,7 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
             if self.reward_function['dynamics']=='linear_mixing_known':
                 # Draw from transition density: Gaussian with known parameters
                 # Propagated mean (resampled)
-                theta_loc=np.einsum('adb,amb->amd', self.reward_function['dynamics_A'], self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a])
+                theta_loc=np.einsum('adb,amb->amd', self.reward_function['dynamics_A'], self.reward_posterior['theta'][np.arange(self.A)[:,None],m_a])
                 # Draw from Gaussian
                 self.reward_posterior['theta']=theta_loc + np.einsum('adb,amb->amd', np.linalg.cholesky(self.reward_function['dynamics_C']), stats.norm.rvs(size=self.reward_posterior['theta'].shape))
             
@@ -104,7 +104,7 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
                 if t>=2*self.reward_posterior['theta'].shape[2] and nu>0:
                     # We compute all sufficient statistics after resampling, to avoid computation of negligible (small weighted) streams
                     # Keep track of whole stream after resampling
-                    self.allTheta[:,:,:,:t+1]=self.allTheta[np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a,:,:t+1]
+                    self.allTheta[:,:,:,:t+1]=self.allTheta[np.arange(self.A)[:,None],m_a,:,:t+1]
       
                     # Data products
                     ZZtop=np.einsum('amdt,ambt->amdb', self.allTheta[:,:,:,0:t-1], self.allTheta[:,:,:,0:t-1])
@@ -149,7 +149,7 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
                 else:
                     # Propagate with priors over dynamics
                     # Propagated mean (resampled)
-                    theta_loc=np.einsum('adb,amb->amd', self.reward_prior['A_0'], self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a])
+                    theta_loc=np.einsum('adb,amb->amd', self.reward_prior['A_0'], self.reward_posterior['theta'][np.arange(self.A)[:,None],m_a])
                     # Draw from Gaussian
                     self.reward_posterior['theta']=theta_loc + np.einsum('adb,amb->amd', np.linalg.cholesky(self.reward_prior['C_0']), stats.norm.rvs(size=self.reward_posterior['theta'].shape))
             else:
@@ -165,26 +165,26 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
             self.reward_posterior['theta'][self.reward_posterior['theta']<0]=0.
             self.reward_posterior['theta'][self.reward_posterior['theta']>1]=1.
             # Draw Bernoulli parameters
-            reward_params_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.arm_predictive_policy['M']),dtype=int), m_a,0]
+            reward_params_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None], m_a,0]
             
             if self.arm_predictive_policy['MC_type'] == 'MC_expectedRewards' or self.arm_predictive_policy['MC_type'] == 'MC_arms':
                 # Compute expected rewards of sampled parameters
                 rewards_expected_samples=reward_params_samples
             elif self.arm_predictive_policy['MC_type'] == 'MC_rewards':
-                # Draw rewards given sampled parameters
-                rewards_samples=self.reward_function['dist'].rvs(reward_params_samples)
+                # Draw Bernoulli rewards given sampled parameters (as single precision uniforms below them, kept as booleans)
+                rewards_samples=self.rng.random(reward_params_samples.shape, dtype=np.float32)<reward_params_samples
                 
         # Contextual Linear Gaussian bandits with NIG prior
         elif self.reward_function['type'] == 'linear_gaussian' and self.reward_prior['dist'] == 'NIG':
             # Draw theta parameters
-            reward_params_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.arm_predictive_policy['M']),dtype=int), m_a]
+            reward_params_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None], m_a]
 
             if 'alpha' in self.reward_prior and 'beta' in self.reward_prior:
                 # Draw variance samples too
-                sigma_samples=self.reward_posterior['sigma'][np.arange(self.A)[:,None]*np.ones((1,self.arm_predictive_policy['M']),dtype=int), m_a,0]
+                sigma_samples=self.reward_posterior['sigma'][np.arange(self.A)[:,None], m_a,0]
             else:
                 # Variance is known
-                sigma_samples=self.reward_function['sigma'][:,None]**2*np.ones((self.A,self.arm_predictive_policy['M']))
+                sigma_samples=np.broadcast_to(self.reward_function['sigma'][:,None]**2, (self.A,self.arm_predictive_policy['M']))
 
             if self.arm_predictive_policy['MC_type'] == 'MC_expectedRewards' or self.arm_predictive_policy['MC_type'] == 'MC_arms':
                 # Compute expected rewards, linearly combining context and sampled parameters
@@ -196,7 +196,7 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
         # Logistic bandits
         elif self.reward_function['type'] == 'logistic':
             # Draw theta parameters
-            reward_params_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.arm_predictive_policy['M']),dtype=int), m_a]
+            reward_params_samples=self.reward_posterior['theta'][np.arange(self.A)[:,None], m_a]
             # Compute linear combination of context and parameters
             xTheta=np.einsum('d,amd->am', self.context[:,t], reward_params_samples)
             
@@ -204,8 +204,8 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
                 # Expected rewards are given by the logistic function of context and parameters
                 rewards_expected_samples=np.exp(xTheta)/(1+np.exp(xTheta))
             elif self.arm_predictive_policy['MC_type'] == 'MC_rewards':
-                # Draw rewards given sampled logistic function of context and parameters
-                rewards_samples=stats.bernoulli.rvs(np.exp(xTheta)/(1+np.exp(xTheta)))
+                # Draw rewards given sampled logistic function of context and parameters (as single precision uniforms below them, kept as booleans)
+                rewards_samples=self.rng.random(xTheta.shape, dtype=np.float32)<np.exp(xTheta)/(1+np.exp(xTheta))
             
         else:
             raise ValueError('reward_function={} with reward_prior={} not implemented yet'.format(self.reward_function['type'], self.reward_prior['dist'].name))
@@ -214,15 +214,15 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
         if self.arm_predictive_policy['MC_type'] == 'MC_rewards':
             # Monte Carlo integration over reward samples
             # Mean times reward is maximum
-            self.arm_predictive_density['mean'][:,t]=((rewards_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).mean(axis=1)
-            # Variance of times reward is maximum
-            self.arm_predictive_density['var'][:,t]=((rewards_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).var(axis=1)
+            np.divide(np.bincount(rewards_samples.argmax(axis=0), minlength=self.A), rewards_samples.shape[1], out=self.arm_predictive_density['mean'][:,t])
+            # Variance of times reward is maximum: variance of a Bernoulli indicator, p(1-p)
+            np.multiply(self.arm_predictive_density['mean'][:,t], 1-self.arm_predictive_density['mean'][:,t], out=self.arm_predictive_density['var'][:,t])
             # Also, compute expected rewards
-            self.rewards_expected[:,t]=rewards_samples.mean(axis=1)
+            rewards_samples.mean(axis=1, out=self.rewards_expected[:,t])
             
         elif self.arm_predictive_policy['MC_type'] == 'MC_expectedRewards':
             # First, compute expectation over rewards
-            self.rewards_expected[:,t]=rewards_expected_samples.mean(axis=1)
+            rewards_expected_samples.mean(axis=1, out=self.rewards_expected[:,t])
             
             # Then, Monte Carlo integration over expected reward
             # Arm for which expected reward is maximum
@@ -232,11 +232,11 @@ class MCBanditSampling(BanditSampling, MonteCarloPosterior):
         elif self.arm_predictive_policy['MC_type'] == 'MC_arms':
             # Monte Carlo integration over arm samples
             # Mean times expected reward is maximum
-            self.arm_predictive_density['mean'][:,t]=((rewards_expected_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).mean(axis=1)
-            # Variance of times expected reward is maximum
-            self.arm_predictive_density['var'][:,t]=((rewards_expected_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).var(axis=1)
+            np.divide(np.bincount(rewards_expected_samples.argmax(axis=0), minlength=self.A), rewards_expected_samples.shape[1], out=self.arm_predictive_density['mean'][:,t])
+            # Variance of times expected reward is maximum: variance of a Bernoulli indicator, p(1-p)
+            np.multiply(self.arm_predictive_density['mean'][:,t], 1-self.arm_predictive_density['mean'][:,t], out=self.arm_predictive_density['var'][:,t])
             # Also, compute expected rewards            
-            self.rewards_expected[:,t]=rewards_expected_samples.mean(axis=1)
+            rewards_expected_samples.mean(axis=1, out=self.rewards_expected[:,t])
         else:
             raise ValueError('Arm predictive density computation type={} not implemented yet'.format(self.arm_predictive_policy['MC_type']))
 	
@@ -60,7 +60,7 @@ class MCMCPosterior(object):
             t_init=time.process_time()
             # Time-indexes for this arm
             # Played action
-            a = np.where(self.actions[:,t]==1)[0][0]
+            a = self.arms_played[t]
             t_a=self.actions[a,:]==1
             # Relevant data for this arm
             y_a=self.rewards[a,t_a]
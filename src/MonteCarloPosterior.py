@@ -41,7 +41,8 @@ class MonteCarloPosterior(object):
         ### Initialize from priors
         # Binomial/Bernoulli reward
         if self.reward_function['type'] == 'bernoulli' and self.reward_prior['dist'].name == 'beta':
-            self.reward_posterior['theta'][:,:,0]=self.reward_prior['dist'].rvs(self.reward_prior['alpha'],self.reward_prior['beta'],size=(self.A, self.reward_prior['M']))
+            # Draw Bernoulli parameters (with numpy's beta sampler directly, avoiding scipy.stats' rvs overhead)
+            self.reward_posterior['theta'][:,:,0]=self.rng.beta(self.reward_prior['alpha'],self.reward_prior['beta'],size=(self.A, self.reward_prior['M']))
         # Linear Gaussian reward
         elif self.reward_function['type'] == 'linear_gaussian' and self.reward_prior['dist'] == 'NIG':
             if 'alpha' in self.reward_prior and 'beta' in self.reward_prior:
@@ -94,7 +95,7 @@ class MonteCarloPosterior(object):
         ## Only for STATIC parameters (dynamic parameters have already been propagated)
         if 'dynamics' not in self.reward_function:
             # Resampled
-            theta_resampled=self.reward_posterior['theta'][np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a]
+            theta_resampled=self.reward_posterior['theta'][np.arange(self.A)[:,None],m_a]
             
             # Resampling
             if self.reward_prior['sampling']=='resampling':
@@ -148,7 +149,7 @@ class MonteCarloPosterior(object):
         # Different propagation to account for support (0,\infty)
         if self.reward_function['type'] == 'linear_gaussian' and ('alpha' in self.reward_prior and 'beta' in self.reward_prior):
             # Resample variance
-            sigma_resampled=self.reward_posterior['sigma'][np.arange(self.A)[:,None]*np.ones((1,self.reward_prior['M']),dtype=int),m_a]
+            sigma_resampled=self.reward_posterior['sigma'][np.arange(self.A)[:,None],m_a]
             
             # Resampling
             if self.reward_prior['sampling']=='resampling':
@@ -228,7 +229,7 @@ class MonteCarloPosterior(object):
             # Reinit with priors and equal weights
             self.reward_posterior['weights']=np.ones((self.A,self.reward_prior['M']))/self.reward_prior['M']
             if self.reward_function['type'] == 'bernoulli' and self.reward_prior['dist'].name == 'beta':
-                self.reward_posterior['theta'][:,:,0]=self.reward_prior['dist'].rvs(self.reward_prior['alpha'],self.reward_prior['beta'],size=(self.A, self.reward_prior['M']))
+                self.reward_posterior['theta'][:,:,0]=self.rng.beta(self.reward_prior['alpha'],self.reward_prior['beta'],size=(self.A, self.reward_prior['M']))
             # Linear Gaussian reward
             elif self.reward_function['type'] == 'linear_gaussian' and self.reward_prior['dist'] == 'NIG':
                 if 'alpha' in self.reward_prior and 'beta' in self.reward_prior:
@@ -23,13 +23,16 @@ class OptimalBandit(Bandit):
         # Initialize
         super().__init__(A, reward_function)
         
-    def execute_realizations(self, R, t_max, context=None, exec_type='sequential'):
+    def execute_realizations(self, R, t_max, context=None, exec_type='sequential', n_workers=1, seed=None, memmap_dir=None):
         """ Execute R realizations of the bandit
         Args:
             R: number of realizations to run
             t_max: maximum execution time for the bandit
             context: d_context by (at_least) t_max array with context for every time instant (None if does not apply)
             exec_type: batch (keep data from all realizations) or sequential (update mean and variance of realizations data)
+            n_workers: number of worker processes to execute realizations with (1, the default, to execute in this process; None for all available CPUs)
+            seed: seed for the realizations (None to draw them from numpy's global random state)
+            memmap_dir: directory where to back batch realizations with memory-mapped .npy files (None to keep them in memory)
         """
         
         # Allocate overall variables
@@ -40,27 +43,24 @@ class OptimalBandit(Bandit):
             self.rewards_expected_R={'mean':np.zeros((self.A,t_max)), 'm2':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
             self.actions_R={'mean':np.zeros((self.A,t_max)), 'm2':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
         elif exec_type =='batch':
-            self.rewards_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.regrets_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.cumregrets_R={'all':np.zeros((R,1,t_max)), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
-            self.rewards_expected_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
-            self.actions_R={'all':np.zeros((R,self.A,t_max)), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            # All realizations are kept in single precision (in memory, or memory-mapped to files)
+            self.rewards_R={'all':realizations_array((R,1,t_max), memmap_dir, 'rewards'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.regrets_R={'all':realizations_array((R,1,t_max), memmap_dir, 'regrets'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.cumregrets_R={'all':realizations_array((R,1,t_max), memmap_dir, 'cumregrets'), 'mean':np.zeros((1,t_max)), 'var':np.zeros((1,t_max))}
+            self.rewards_expected_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'rewards_expected'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
+            self.actions_R={'all':realizations_array((R,self.A,t_max), memmap_dir, 'actions'), 'mean':np.zeros((self.A,t_max)), 'var':np.zeros((self.A,t_max))}
         else:
             raise ValueError('Execution type={} not implemented'.format(exec_type))
             
         # Execute all realizations
-        for r in np.arange(R):
-            # Run one realization
-            print('Executing realization {}'.format(r))
-            self.execute(t_max, context)
-
+        for r in self.realizations(R, t_max, context, n_workers, seed):
             if exec_type == 'sequential':
                 # Update overall mean and variance sequentially
-                self.rewards_R['mean'], self.rewards_R['m2'], self.rewards_R['var']=online_update_mean_var(r+1, self.rewards.sum(axis=0), self.rewards_R['mean'], self.rewards_R['m2'])
-                self.regrets_R['mean'], self.regrets_R['m2'], self.regrets_R['var']=online_update_mean_var(r+1, self.regrets, self.regrets_R['mean'], self.regrets_R['m2'])
-                self.cumregrets_R['mean'], self.cumregrets_R['m2'], self.cumregrets_R['var']=online_update_mean_var(r+1, self.cumregrets, self.cumregrets_R['mean'], self.cumregrets_R['m2'])
-                self.rewards_expected_R['mean'], self.rewards_expected_R['m2'], self.rewards_expected_R['var']=online_update_mean_var(r+1, self.rewards_expected, self.rewards_expected_R['mean'], self.rewards_expected_R['m2'])
-                self.actions_R['mean'], self.actions_R['m2'], self.actions_R['var']=online_update_mean_var(r+1, self.actions, self.actions_R['mean'], self.actions_R['m2'])
+                online_update_mean_var(r+1, self.rewards.sum(axis=0), self.rewards_R)
+                online_update_mean_var(r+1, self.regrets, self.regrets_R)
+                online_update_mean_var(r+1, self.cumregrets, self.cumregrets_R)
+                online_update_mean_var(r+1, self.rewards_expected, self.rewards_expected_R)
+                online_update_mean_var(r+1, self.actions, self.actions_R)
             else:
                 self.rewards_R['all'][r,0,:]=self.rewards.sum(axis=0)
                 self.regrets_R['all'][r,0,:]=self.regrets
@@ -69,17 +69,12 @@ class OptimalBandit(Bandit):
                 self.actions_R['all'][r,:,:]=self.actions
                 
         if exec_type == 'batch':
-            # Compute sufficient statistics
-            self.rewards_R['mean']=self.rewards_R['all'].mean(axis=0)
-            self.rewards_R['var']=self.rewards_R['all'].var(axis=0)
-            self.regrets_R['mean']=self.regrets_R['all'].mean(axis=0)
-            self.regrets_R['var']=self.regrets_R['all'].var(axis=0)
-            self.cumregrets_R['mean']=self.cumregrets_R['all'].mean(axis=0)
-            self.cumregrets_R['var']=self.cumregrets_R['all'].var(axis=0)
-            self.rewards_expected_R['mean']=self.rewards_expected_R['all'].mean(axis=0)
-            self.rewards_expected_R['var']=self.rewards_expected_R['all'].var(axis=0)
-            self.actions_R['mean']=self.actions_R['all'].mean(axis=0)
-            self.actions_R['var']=self.actions_R['all'].var(axis=0)
+            # Compute sufficient statistics, in double precision into the preallocated arrays
+            batch_mean_var(self.rewards_R)
+            batch_mean_var(self.regrets_R)
+            batch_mean_var(self.cumregrets_R)
+            batch_mean_var(self.rewards_expected_R)
+            batch_mean_var(self.actions_R)
         
     def execute(self, t_max, context=None):
         """ Execute the Bayesian bandit
@@ -142,15 +142,15 @@ class VariationalBanditSampling(BanditSampling, VariationalPosterior):
         if self.arm_predictive_policy['MC_type'] == 'MC_rewards':
             # Monte Carlo integration over reward samples
             # Mean times reward is maximum
-            self.arm_predictive_density['mean'][:,t]=((rewards_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).mean(axis=1)
-            # Variance of times reward is maximum
-            self.arm_predictive_density['var'][:,t]=((rewards_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).var(axis=1)
+            np.divide(np.bincount(rewards_samples.argmax(axis=0), minlength=self.A), rewards_samples.shape[1], out=self.arm_predictive_density['mean'][:,t])
+            # Variance of times reward is maximum: variance of a Bernoulli indicator, p(1-p)
+            np.multiply(self.arm_predictive_density['mean'][:,t], 1-self.arm_predictive_density['mean'][:,t], out=self.arm_predictive_density['var'][:,t])
             # Also, compute expected rewards
-            self.rewards_expected[:,t]=rewards_samples.mean(axis=1)
+            rewards_samples.mean(axis=1, out=self.rewards_expected[:,t])
             
         elif self.arm_predictive_policy['MC_type'] == 'MC_expectedRewards':
             # First, compute expectation over rewards
-            self.rewards_expected[:,t]=rewards_expected_samples.mean(axis=1)
+            rewards_expected_samples.mean(axis=1, out=self.rewards_expected[:,t])
             
             # Then, Monte Carlo integration over expected reward
             # Arm for which expected reward is maximum
@@ -160,11 +160,11 @@ class VariationalBanditSampling(BanditSampling, VariationalPosterior):
         elif self.arm_predictive_policy['MC_type'] == 'MC_arms':
             # Monte Carlo integration over arm samples
             # Mean times expected reward is maximum
-            self.arm_predictive_density['mean'][:,t]=((rewards_expected_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).mean(axis=1)
-            # Variance of times expected reward is maximum
-            self.arm_predictive_density['var'][:,t]=((rewards_expected_samples.argmax(axis=0)[None,:]==np.arange(self.A)[:,None]).astype(int)).var(axis=1)
+            np.divide(np.bincount(rewards_expected_samples.argmax(axis=0), minlength=self.A), rewards_expected_samples.shape[1], out=self.arm_predictive_density['mean'][:,t])
+            # Variance of times expected reward is maximum: variance of a Bernoulli indicator, p(1-p)
+            np.multiply(self.arm_predictive_density['mean'][:,t], 1-self.arm_predictive_density['mean'][:,t], out=self.arm_predictive_density['var'][:,t])
             # Also, compute expected rewards            
-            self.rewards_expected[:,t]=rewards_expected_samples.mean(axis=1)
+            rewards_expected_samples.mean(axis=1, out=self.rewards_expected[:,t])
         else:
             raise ValueError('Arm predictive density computation type={} not implemented yet'.format(self.arm_predictive_policy['MC_type']))
 	